@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+# Aho-Corasick multi-pattern exact matching.
+# A whole batch of patterns (e.g. reads and their reverse complements) is
+# compiled into one automaton, and the text is scanned once: the cost is
+# O(len(t) + number of hits) instead of one full scan of t per pattern.
+
+from collections import deque
+
+from alignment_naive_matching import reverseComplement
+from kmerEncoding import iter_bases
+
+
+class AhoCorasick(object):
+    """ Holds an Aho-Corasick automaton for a list of patterns """
+
+    def __init__(self, patterns):
+        """ Build the trie of patterns, then its failure and output links """
+        self.lengths = [len(p) for p in patterns]
+        goto = [{}]  # trie edges
+        out = [[]]  # ids of the patterns ending at each node
+        for pid, p in enumerate(patterns):
+            if len(p) == 0:
+                raise ValueError('patterns must be non-empty')
+            node = 0
+            for c in p:
+                if c not in goto[node]:
+                    goto[node][c] = len(goto)
+                    goto.append({})
+                    out.append([])
+                node = goto[node][c]
+            out[node].append(pid)
+
+        # Breadth-first: failure link = longest proper suffix that is also a trie node.
+        # delta completes the trie edges with failure transitions, so the scan
+        # makes exactly one dictionary lookup per text character.
+        fail = [0] * len(goto)
+        self.out_link = [-1] * len(goto)  # nearest node on the failure chain with outputs
+        self.delta = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            f = fail[node]
+            self.out_link[node] = f if out[f] else self.out_link[f]
+            for c, nxt in goto[node].items():
+                fail[nxt] = self.delta[f].get(c, 0)
+                queue.append(nxt)
+            for c, nxt in self.delta[f].items():
+                if c not in self.delta[node]:
+                    self.delta[node][c] = nxt
+        self.out = out
+
+    def search(self, t):
+        """ Yield (pattern id, offset) for every occurrence of every pattern in t """
+        delta, out, out_link, lengths = self.delta, self.out, self.out_link, self.lengths
+        node = 0
+        for end, c in enumerate(iter_bases(t), 1):
+            node = delta[node].get(c, 0)
+            hit = node if out[node] else out_link[node]
+            while hit > 0:
+                for pid in out[hit]:
+                    yield pid, end - lengths[pid]
+                hit = out_link[hit]
+
+
+def multi_pattern_with_rc(patterns, t):
+    """
+    Find exact occurrences of many patterns and of their reverse complements in one pass over t.
+
+    Parameters:
+    - patterns (list): The patterns to search for in the text.
+    - t (str): The text where the patterns are to be searched.
+
+    Returns:
+    - list: For each pattern, a tuple of two sorted lists like naive_with_rc returns:
+        - List of starting positions of occurrences of the pattern.
+        - List of starting positions of occurrences of its reverse complement.
+    """
+
+    automaton = AhoCorasick(list(patterns) + [reverseComplement(p) for p in patterns])
+    hits = [([], []) for _ in patterns]
+    for pid, offset in automaton.search(t):
+        if pid < len(patterns):
+            hits[pid][0].append(offset)
+        else:
+            hits[pid - len(patterns)][1].append(offset)
+    for forward, reverse in hits:
+        forward.sort()
+        reverse.sort()
+    return hits
+
+
+def count_matched_reads_multi(reads, genome, prefix_length=30):
+    """
+    Count the number of reads (first 30 bases/prefix) that match the genome on either strand,
+    scanning the genome once for the whole batch (same result as count_matched_reads).
+
+    Args:
+    reads (iterable): Reads from the genome, as strings or as FASTQRecord objects.
+    genome (str): The reference genome to match against.
+    prefix_length (int): The number of leading bases of each read to match.
+
+    Returns:
+    tuple: A tuple containing the number of reads matched to the genome and the total number of reads processed.
+    """
+
+    prefixes = []
+    for r in reads:
+        if not isinstance(r, str):
+            r = r.seq  # FASTQRecord from the streaming reader
+        prefixes.append(r[0:prefix_length])
+
+    matched = set()
+    nonempty = [i for i, p in enumerate(prefixes) if p]
+    patterns = [prefixes[i] for i in nonempty]
+    automaton = AhoCorasick(patterns + [reverseComplement(p) for p in patterns])
+    for pid, _ in automaton.search(genome):
+        matched.add(nonempty[pid % len(patterns)])
+    # an empty prefix matches everywhere, as it does with naive_matching
+    return len(matched) + len(prefixes) - len(nonempty), len(prefixes)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+# Batch read mapping.
+# Reads are streamed from a FASTQ file in batches and mapped by a pool of
+# worker processes. Every worker memory-maps the same reference (see
+# mappedReference) and the same saved index (see indexIO), so the genome and
+# the index exist once in physical memory however many workers run.
+# Results come back in input order and are written one line per read:
+#   name <TAB> forward offsets <TAB> reverse-complement offsets
+# with offsets comma-separated and '*' when a strand has no hit.
+
+import argparse
+import itertools
+import multiprocessing
+import sys
+
+from alignment_queryIndex_exactMatching import queryIndex_exactMatching
+from alignment_querySubseq_exactMatching import querySubseq_exactMatching
+from dnaStrand import search_strands
+from indexIO import index_kind
+from kmerIndex_binarySearch import Index
+from kmerIndex_hashed import HashedIndex
+from mappedReference import open_reference
+from minimizerIndex import MinimizerIndex
+from readFASTQ import parseFASTQ
+from subSeqIndex_binarySearch import SubseqIndex
+
+INDEX_CLASSES = {'kmer': Index, 'hashed': HashedIndex, 'subseq': SubseqIndex, 'minimizr': MinimizerIndex}
+
+_reference = None  # per-process state set by _init_worker
+_index = None
+_max_hits = None
+
+
+def load_mapping_index(reference_path, index_path, verify=True):
+    """
+    Open a reference and the index saved for it, both memory-mapped.
+
+    Parameters:
+    - reference_path (str): The reference (see mappedReference.open_reference).
+    - index_path (str): An Index, HashedIndex, SubseqIndex or MinimizerIndex saved for that reference.
+    - verify (bool): If True, check the reference checksum stored in the index.
+
+    Returns:
+    - tuple: The reference view and the loaded index.
+    """
+
+    reference = open_reference(reference_path)
+    kind = index_kind(index_path)
+    if kind not in INDEX_CLASSES:
+        raise ValueError('%s: cannot map reads with a %s index' % (index_path, kind))
+    return reference, INDEX_CLASSES[kind].load(index_path, reference, verify)
+
+
+def _init_worker(reference_path, index_path, max_hits=None):
+    global _reference, _index, _max_hits
+    _max_hits = max_hits
+    # the parent already verified the checksum; workers skip the extra pass over the genome
+    _reference, _index = load_mapping_index(reference_path, index_path, verify=False)
+
+
+def map_read(seq, t, index, max_hits=None):
+    """
+    Find the exact occurrences of a read on both strands using an index.
+
+    Parameters:
+    - seq (str): The read sequence.
+    - t (str): The reference text the index was built from.
+    - index (Index, HashedIndex, SubseqIndex or MinimizerIndex): The index of 't'.
+    - max_hits (int): Skip seeds with more index hits than this (see seedOccurrence), so a
+                      read made of a repeat costs a bounded amount of work.
+
+    Returns:
+    - tuple: Sorted offsets of the read and of its reverse complement.
+    """
+
+    if isinstance(index, SubseqIndex):
+        def search(p):
+            return sorted(set(querySubseq_exactMatching(p, t, index, max_hits=max_hits)[0]))
+    else:
+        def search(p):
+            return sorted(queryIndex_exactMatching(p, t, index, max_hits=max_hits))
+    hits = search_strands(search, seq)  # a palindromic read is only looked up once
+    return ([offset for offset, strand in hits if strand == '+'],
+            [offset for offset, strand in hits if strand == '-'])
+
+
+def _map_batch(batch):
+    return [(record.name, map_read(record.seq, _reference, _index, _max_hits)) for record in batch]
+
+
+def _batches(reads, batch_size):
+    """ Batches of FASTQRecords from a FASTQ path or an iterable of records """
+    if isinstance(reads, str):
+        return parseFASTQ(reads, batch_size=batch_size)
+    reads = iter(reads)
+    return iter(lambda: list(itertools.islice(reads, batch_size)), [])
+
+
+def format_hits(name, hits):
+    """ Return the output line for one read """
+    forward, reverse = hits
+    return '%s\t%s\t%s\n' % (name,
+                             ','.join(map(str, forward)) or '*',
+                             ','.join(map(str, reverse)) or '*')
+
+
+def map_reads(reads, reference_path, index_path, out, processes=None, batch_size=1000, max_hits=None):
+    """
+    Map reads to a reference with a prebuilt index, spreading batches across processes.
+
+    Parameters:
+    - reads (str or iterable): A FASTQ path (optionally gzip-compressed) or an iterable of FASTQRecords.
+    - reference_path (str): The reference (see mappedReference.open_reference).
+    - index_path (str): An Index, HashedIndex, SubseqIndex or MinimizerIndex saved for that reference (see indexIO).
+    - out (file object): Where to write one line per read, in input order.
+    - processes (int): The number of worker processes; defaults to the CPU count. 1 maps in this process.
+    - batch_size (int): The number of reads sent to a worker at a time.
+    - max_hits (int): Skip seeds with more index hits than this; None keeps every hit.
+
+    Returns:
+    - tuple: A tuple containing the number of reads with at least one hit and the total number of reads.
+    """
+
+    reference, index = load_mapping_index(reference_path, index_path)  # fail fast on a mismatched index
+    batches = _batches(reads, batch_size)
+    num_mapped = 0
+    n = 0
+
+    if processes == 1:
+        results = ([(record.name, map_read(record.seq, reference, index, max_hits)) for record in batch]
+                   for batch in batches)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, initializer=_init_worker,
+                                    initargs=(reference_path, index_path, max_hits))
+        results = pool.imap(_map_batch, batches)  # imap keeps input order
+
+    try:
+        for batch in results:
+            for name, hits in batch:
+                out.write(format_hits(name, hits))
+                n += 1
+                if hits[0] or hits[1]:
+                    num_mapped += 1
+    except BaseException:
+        if pool is not None:
+            pool.terminate()  # do not wait for the queued work before the error surfaces
+            pool.join()
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    return num_mapped, n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Map FASTQ reads to a reference using a saved index.')
+    parser.add_argument('reads', help='FASTQ file (optionally gzip-compressed)')
+    parser.add_argument('reference', help='reference FASTA, .pack or .seq file')
+    parser.add_argument('index', help='index saved for the reference')
+    parser.add_argument('-p', '--processes', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('-b', '--batch-size', type=int, default=1000, help='reads per batch')
+    parser.add_argument('-m', '--max-hits', type=int, default=None,
+                        help='skip seeds with more index hits than this (default: keep all)')
+    args = parser.parse_args(argv)
+
+    num_mapped, n = map_reads(args.reads, args.reference, args.index, sys.stdout,
+                              processes=args.processes, batch_size=args.batch_size,
+                              max_hits=args.max_hits)
+    sys.stderr.write('%d / %d reads matched the genome\n' % (num_mapped, n))
+
+
+if __name__ == '__main__':
+    main()
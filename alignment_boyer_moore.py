@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 
-from bm_preproc import BoyerMoore
+from bm_preproc import BoyerMoore, compile_boyer_moore
+from dnaStrand import search_strands
 
-def boyer_moore_with_counts(p, p_bm, t):
+def boyer_moore_with_counts(p, p_bm, t, strand=None):
     """
     Perform Boyer-Moore matching and count the number of alignments and character comparisons.
 
@@ -10,14 +11,22 @@ def boyer_moore_with_counts(p, p_bm, t):
     - p (str): The pattern to search for in the text.
     - p_bm (BoyerMoore): The BoyerMoore object preprocessed for the pattern.
     - t (str): The text where the pattern is to be searched.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
 
     Returns:
     - tuple: A tuple containing three elements:
-        - list: A list containing the starting positions of occurrences of the pattern in the text.
+        - list: A list containing the starting positions of occurrences of the pattern in the text,
+                or of (offset, strand) tuples when 'strand' is given.
         - int: The number of alignments tried.
         - int: The number of character comparisons performed.
     """
     
+    if strand is not None:
+        alphabet = ''.join(sorted(p_bm.amap, key=p_bm.amap.get))
+        def search(q): # the reverse complement gets its own (cached) preprocessing
+            return boyer_moore_with_counts(q, p_bm if q == p else compile_boyer_moore(q, alphabet), t)
+        return search_strands(search, p, strand)
+
     i = 0
     occurrences = []
     num_alignments = 0 #the number of alignments tried
@@ -2,10 +2,12 @@
 
 #using Boyer Moore + pigeonhole principle
 
-from bm_preproc import BoyerMoore
+from alignment_hammingDistance import hamming_verify, iter_hamming_verify
+from bm_preproc import compile_boyer_moore
+from dnaStrand import search_strands
 
 #run Boyer_Moore Algorithm
-def boyer_moore(p, p_bm, t):
+def boyer_moore(p, p_bm, t, strand=None):
       """
       Perform string matching using the Boyer-Moore algorithm.
 
@@ -13,13 +15,35 @@ def boyer_moore(p, p_bm, t):
       - p (str): The pattern to search for in the text.
       - p_bm (BoyerMoore): The BoyerMoore object preprocessed for the pattern.
       - t (str): The text where the pattern is to be searched.
+      - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
 
       Returns:
-      - list: A list containing the starting positions of occurrences of the pattern in the text.
+      - list: A list containing the starting positions of occurrences of the pattern in the text,
+              or of (offset, strand) tuples when 'strand' is given.
       """
                   
+      if strand is not None:
+        alphabet = ''.join(sorted(p_bm.amap, key=p_bm.amap.get))
+        def search(q): # the reverse complement gets its own (cached) preprocessing
+            return boyer_moore(q, p_bm if q == p else compile_boyer_moore(q, alphabet), t)
+        return search_strands(search, p, strand)
+      return list(iter_boyer_moore(p, p_bm, t))
+
+def iter_boyer_moore(p, p_bm, t):
+      """
+      Lazy version of boyer_moore: yield each occurrence as soon as it is found,
+      so the scan can be stopped early (see matchIter).
+
+      Parameters:
+      - p (str): The pattern to search for in the text.
+      - p_bm (BoyerMoore): The BoyerMoore object preprocessed for the pattern.
+      - t (str): The text where the pattern is to be searched.
+
+      Returns:
+      - generator: Yields the starting positions of occurrences of the pattern in the text, in increasing order.
+      """
+
       i = 0 #keep track the location on the text
-      occurrences = []
       while i < len(t) - len(p) + 1:
         shift = 1
         mismatched = False
@@ -31,13 +55,35 @@ def boyer_moore(p, p_bm, t):
                 mismatched = True
                 break
         if not mismatched:
-            occurrences.append(i)
+            yield i
             skip_gs = p_bm.match_skip()
             shift = max(shift, skip_gs)
         i += shift
-      return occurrences
 
-def bm_approximate_matching(p, t, n):
+def boyer_moore_compiled(p, t, alphabet='ACGT', strand=None):
+      """
+      Perform string matching using a cached, precompiled Boyer-Moore shift table.
+
+      Parameters:
+      - p (str): The pattern to search for in the text.
+      - t (str): The text where the pattern is to be searched.
+      - alphabet (str): The alphabet used to preprocess the pattern.
+      - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
+
+      Returns:
+      - list: A list containing the starting positions of occurrences of the pattern in the text,
+              or of (offset, strand) tuples when 'strand' is given.
+      """
+
+      if strand is not None:
+        return search_strands(lambda q: boyer_moore_compiled(q, t, alphabet), p, strand)
+      return compile_boyer_moore(p, alphabet).search(t)
+
+def iter_boyer_moore_compiled(p, t, alphabet='ACGT'):
+      """ Lazy version of boyer_moore_compiled: yield each occurrence as soon as it is found """
+      return compile_boyer_moore(p, alphabet).iter_search(t)
+
+def bm_approximate_matching(p, t, n, strand=None, genome=None):
       """
       Find approximate occurrences of a pattern in a text allowing up to 'n' mismatches.
 
@@ -45,42 +91,53 @@ def bm_approximate_matching(p, t, n):
       - p (str): The pattern to search for in the text.
       - t (str): The text where the pattern is to be searched.
       - n (int): The maximum number of mismatches allowed.
+      - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
+      - genome (numpy.ndarray): Optional alignment_hammingDistance.genome_array(t), kept by a caller
+                                that verifies many reads against the same text.
 
       Returns:
-      - list: A list containing the starting positions of approximate occurrences of the pattern in the text.
+      - list: A list containing the starting positions of approximate occurrences of the pattern in the text,
+              or of (offset, strand) tuples when 'strand' is given.
       """
       
+      if strand is not None:
+        return search_strands(lambda q: bm_approximate_matching(q, t, n, None, genome), p, strand)
+
       segment_length = int(round(len(p) / (n+1)))
-      all_matches = set()
+      candidates = set()
       for i in range(n+1):
         start = i*segment_length
         end = min((i+1)*segment_length, len(p))
-        p_bm = BoyerMoore(p[start:end], alphabet='ACGT')
-        matches = boyer_moore(p[start:end], p_bm, t)
+        matches = boyer_moore_compiled(p[start:end], t) # preprocessing is cached across reads
         
-        # Check if the match is within bounds
-        for m in matches:
-            if m < start or m-start+len(p) > len(t):
-                continue
-            mismatches = 0
-            
-            # Check mismatches before the start index
-            for j in range(0, start):
-                if not p[j] == t[m-start+j]:
-                    mismatches += 1
-                    if mismatches > n:
-                        break
-            
-            # Check mismatches after the end index
-            for j in range(end, len(p)):
-                if not p[j] == t[m-start+j]:
-                    mismatches += 1
-                    if mismatches > n:
-                        break
-                        
-            # If total mismatches are within the allowed limit, add the match index to the set 
-            # m - start to get the position of text which match with the first offset of pattern
-            if mismatches <= n:
-                all_matches.add(m - start)
+        # m - start to get the position of text which match with the first offset of pattern
+        candidates.update(m - start for m in matches)
                 
-      return list(all_matches)
+      # Verify every candidate window at once; windows out of bounds are dropped
+      return hamming_verify(p, t, candidates, n, genome)[0]
+
+def iter_bm_approximate_matching(p, t, n, genome=None):
+      """
+      Lazy version of bm_approximate_matching: the partitions are searched and the
+      candidates verified a chunk at a time, so the work stops with the caller (see matchIter).
+
+      Parameters:
+      - p (str): The pattern to search for in the text.
+      - t (str): The text where the pattern is to be searched.
+      - n (int): The maximum number of mismatches allowed.
+      - genome (numpy.ndarray): Optional alignment_hammingDistance.genome_array(t), kept by a caller
+                                that verifies many reads against the same text.
+
+      Returns:
+      - generator: Yields each starting position of an approximate occurrence once, in the order found.
+      """
+
+      segment_length = int(round(len(p) / (n+1)))
+      def candidates():
+        for i in range(n+1):
+            start = i*segment_length
+            end = min((i+1)*segment_length, len(p))
+            for m in iter_boyer_moore_compiled(p[start:end], t):
+                yield m - start
+      for offset, _ in iter_hamming_verify(p, t, candidates(), n, genome=genome):
+        yield offset
@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 
+from alignment_globalAlignment import banded_alignment, hirschberg_alignment
+
 def editDistance(x, y):
     """
     Calculate the edit distance between two strings.
@@ -34,3 +36,50 @@ def editDistance(x, y):
             
     # Edit distance is the value in the bottom right corner of the matrix
     return D[-1][-1]
+
+
+def _unit_sub(a, b):
+    return 0 if a == b else 1
+
+
+def _unit_gap(c):
+    return 1
+
+
+def editDistance_banded(x, y, band):
+    """
+    Calculate the edit distance between two strings if it is at most 'band'.
+
+    Any alignment with at most 'band' edits stays within 'band' cells of the main
+    diagonal, so only O(len(x) * band) cells are needed to get the exact answer.
+
+    Parameters:
+    - x (str): The first string.
+    - y (str): The second string.
+    - band (int): The maximum edit distance of interest.
+
+    Returns:
+    - int: The edit distance between the two strings, or None if it is greater than 'band'.
+    """
+
+    distance = banded_alignment(x, y, band, _unit_sub, _unit_gap)
+    if distance is None or distance > band:
+        return None
+    return distance
+
+
+def editDistance_alignment(x, y):
+    """
+    Calculate the edit distance between two strings and an optimal alignment, in linear space.
+
+    Parameters:
+    - x (str): The first string (the query).
+    - y (str): The second string (the reference).
+
+    Returns:
+    - tuple: A tuple containing two elements:
+        - int: The edit distance between the two strings.
+        - str: An optimal alignment as a CIGAR string (see alignment_globalAlignment.hirschberg_alignment).
+    """
+
+    return hirschberg_alignment(x, y, _unit_sub, _unit_gap)
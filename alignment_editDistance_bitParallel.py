@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+# Myers' bit-vector algorithm (Myers 1999, in the formulation of Hyyro 2001).
+# One column of the approximate-matching DP matrix is held as two bit vectors
+# of vertical +1 / -1 differences, and each text character updates the whole
+# column with a handful of integer operations. Python ints are arbitrary
+# precision, so a pattern of any length fits in one "word": the search takes
+# O(n * ceil(m/w)) time and O(m) memory instead of the (m+1) x (n+1) matrix of
+# editDistance_approximate_matching.
+
+from kmerEncoding import iter_bases
+
+
+def _pattern_masks(p):
+    """ Bit mask of the positions of each character in p (bit i is p[i]) """
+    peq = {}
+    for i, c in enumerate(p):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def iter_myers_scores(p, t):
+    """
+    Yield the last row of the approximate-matching DP matrix one column at a time.
+
+    Parameters:
+    - p (str): The pattern.
+    - t (str): The text (a str or a str-like reference view).
+
+    Returns:
+    - generator: Yields (end, distance) for end = 0..len(t), where 'distance' is the smallest
+                 edit distance between 'p' and a substring of 't' ending just before 'end'.
+    """
+
+    m = len(p)
+    score = m
+    yield 0, score
+    if m == 0:
+        for j in range(1, len(t) + 1):
+            yield j, 0
+        return
+
+    peq = _pattern_masks(p)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv = mask  # vertical +1 differences: the first column is 0, 1, ..., m
+    mv = 0  # vertical -1 differences
+    for j, c in enumerate(iter_bases(t), 1):
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        # the top row is all zeros (a match may start anywhere), so nothing is shifted in
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        yield j, score
+
+
+def myers_search(p, t, k):
+    """
+    Find every end position of an approximate occurrence of p in t within edit distance k.
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+    - k (int): The maximum edit distance allowed.
+
+    Returns:
+    - list: (end, distance) tuples, where 'end' is the offset just past the last matched
+            character of 't', in increasing order of 'end'.
+    """
+
+    return [(end, distance) for end, distance in iter_myers_scores(p, t) if distance <= k]
+
+
+def myers_approximate_matching(x, y):
+    """
+    Calculate the approximate edit distance between two strings
+    (bit-parallel drop-in for editDistance_approximate_matching).
+
+    Parameters:
+    - x (str): The first string (the pattern).
+    - y (str): The second string (the text).
+
+    Returns:
+    - int: The minimum approximate edit distance between the two strings.
+    """
+
+    return min(distance for _, distance in iter_myers_scores(x, y))
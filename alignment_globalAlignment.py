@@ -45,3 +45,176 @@ def globalAlignment(x, y):
             D[i][j] = min(distHor, distVer, distDiag)
     
     return D[-1][-1]  # return value in bottom right corner
+
+
+def _matrix_costs(score, alphabet):
+    """ Substitution and gap cost functions for a score matrix (see 'score' above) """
+    sub = {a: {b: score[i][j] for j, b in enumerate(alphabet)} for i, a in enumerate(alphabet)}
+    gap = {a: score[i][-1] for i, a in enumerate(alphabet)}
+    return (lambda a, b: sub[a][b]), gap.__getitem__
+
+
+def banded_alignment(x, y, band, sub, gap):
+    """
+    Computes the global alignment cost of x and y using only DP cells with |i - j| <= band.
+
+    Parameters:
+    - x (str): The first sequence.
+    - y (str): The second sequence.
+    - band (int): The maximum distance of a cell from the main diagonal.
+    - sub (function): sub(a, b) is the cost of aligning character a of x with character b of y.
+    - gap (function): gap(c) is the cost of aligning character c against a gap.
+
+    Returns:
+    - int: The lowest cost of an alignment that stays inside the band, or None if
+           |len(x) - len(y)| > band so that no such alignment exists.
+    """
+
+    m, n = len(x), len(y)
+    if abs(m - n) > band:
+        return None
+
+    # prev[j - prev_lo] holds D[i-1][j] for the cells of row i-1 inside the band
+    prev_lo = 0
+    prev = [0]
+    for j in range(1, min(n, band) + 1):
+        prev.append(prev[-1] + gap(y[j-1]))
+
+    for i in range(1, m + 1):
+        lo, hi = max(0, i - band), min(n, i + band)
+        prev_hi = prev_lo + len(prev) - 1
+        cur = []
+        for j in range(lo, hi + 1):
+            best = None
+            if j <= prev_hi:  # vertical: gap in y
+                best = prev[j - prev_lo] + gap(x[i-1])
+            if j > lo:  # horizontal: gap in x
+                dist = cur[-1] + gap(y[j-1])
+                if best is None or dist < best:
+                    best = dist
+            if j > 0 and j - 1 >= prev_lo:  # diagonal
+                dist = prev[j - 1 - prev_lo] + sub(x[i-1], y[j-1])
+                if best is None or dist < best:
+                    best = dist
+            cur.append(best)
+        prev, prev_lo = cur, lo
+
+    return prev[n - prev_lo]
+
+
+def globalAlignment_banded(x, y, band):
+    """
+    Computes the global alignment score between x and y within a band around the main diagonal.
+
+    Only O(len(x) * band) cells are filled. The result equals globalAlignment(x, y)
+    whenever an optimal alignment never drifts more than 'band' cells off the diagonal,
+    e.g. when verifying an index hit that is expected to have few indels.
+
+    Parameters:
+    - x (str): The first sequence.
+    - y (str): The second sequence.
+    - band (int): The maximum band width (maximum expected number of net insertions/deletions).
+
+    Returns:
+    - int: The best global alignment score inside the band, or None if |len(x) - len(y)| > band.
+    """
+
+    sub, gap = _matrix_costs(score, alphabet)
+    return banded_alignment(x, y, band, sub, gap)
+
+
+def _last_row(x, y, sub, gap):
+    """ Costs of aligning all of x against each prefix of y, in linear space """
+    row = [0]
+    for c in y:
+        row.append(row[-1] + gap(c))
+    for a in x:
+        prev, row = row, [row[0] + gap(a)]
+        for j, b in enumerate(y, 1):
+            row.append(min(row[j-1] + gap(b), prev[j] + gap(a), prev[j-1] + sub(a, b)))
+    return row
+
+
+def _hirschberg(x, y, sub, gap, ops):
+    """ Append the operations of an optimal alignment of x and y to ops """
+    if len(x) == 0:
+        ops.extend('D' * len(y))
+    elif len(y) == 0:
+        ops.extend('I' * len(x))
+    elif len(x) == 1:
+        # x[0] either goes against a gap or against the best character of y
+        gaps = sum(gap(b) for b in y)
+        best, best_j = gap(x[0]) + gaps, None
+        for j, b in enumerate(y):
+            cost = gaps - gap(b) + sub(x[0], b)
+            if cost < best:
+                best, best_j = cost, j
+        if best_j is None:
+            ops.extend('I' + 'D' * len(y))
+        else:
+            ops.extend('D' * best_j + 'M' + 'D' * (len(y) - best_j - 1))
+    else:
+        # split x in half and find where an optimal path crosses the middle row
+        mid = len(x) // 2
+        left = _last_row(x[:mid], y, sub, gap)
+        right = _last_row(x[mid:][::-1], y[::-1], sub, gap)
+        split = min(range(len(y) + 1), key=lambda j: left[j] + right[len(y) - j])
+        _hirschberg(x[:mid], y[:split], sub, gap, ops)
+        _hirschberg(x[mid:], y[split:], sub, gap, ops)
+
+
+def hirschberg_alignment(x, y, sub, gap):
+    """
+    Computes an optimal global alignment of x and y in linear space (Hirschberg's algorithm).
+
+    Parameters:
+    - x (str): The first sequence (the query).
+    - y (str): The second sequence (the reference).
+    - sub (function): sub(a, b) is the cost of aligning character a of x with character b of y.
+    - gap (function): gap(c) is the cost of aligning character c against a gap.
+
+    Returns:
+    - tuple: A tuple containing two elements:
+        - int: The cost of the alignment.
+        - str: The alignment as a CIGAR string, where 'M' aligns a character of x with one of y,
+               'I' is a character of x against a gap and 'D' is a character of y against a gap.
+    """
+
+    ops = []
+    _hirschberg(x, y, sub, gap, ops)
+
+    cost, i, j = 0, 0, 0
+    cigar = []
+    for op in ops:
+        if op == 'M':
+            cost += sub(x[i], y[j])
+            i, j = i + 1, j + 1
+        elif op == 'I':
+            cost += gap(x[i])
+            i += 1
+        else:
+            cost += gap(y[j])
+            j += 1
+        if cigar and cigar[-1][1] == op:
+            cigar[-1][0] += 1
+        else:
+            cigar.append([1, op])
+    return cost, ''.join('%d%s' % (length, op) for length, op in cigar)
+
+
+def globalAlignment_hirschberg(x, y):
+    """
+    Computes the global alignment of x and y in linear space and returns the alignment itself.
+
+    Parameters:
+    - x (str): The first sequence (the query).
+    - y (str): The second sequence (the reference).
+
+    Returns:
+    - tuple: A tuple containing two elements:
+        - int: The global alignment score, equal to globalAlignment(x, y).
+        - str: An optimal alignment as a CIGAR string (see hirschberg_alignment).
+    """
+
+    sub, gap = _matrix_costs(score, alphabet)
+    return hirschberg_alignment(x, y, sub, gap)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+
+# Vectorized Hamming-distance (k-mismatch) matching.
+# The genome is viewed as a NumPy uint8 array and the pattern is compared
+# against many windows at once: for each pattern position j, one gather
+# t[starts + j] != p[j] updates the mismatch counts of every window. The same
+# kernel serves a full scan of the text (every window is a candidate) and the
+# verification step of the pigeonhole matchers (only the windows suggested by
+# an exact-matching filter or an index are candidates). Windows that already
+# exceed k mismatches are dropped as the columns go by. The kernel costs one
+# NumPy call per pattern column however few windows there are, so a handful of
+# candidates are compared character by character instead. Without a genome
+# array from the caller, verification encodes only the candidate windows, so a
+# call never copies the whole text.
+
+import itertools
+
+import numpy as np
+
+from mappedReference import MappedSequence
+
+CHUNK_SIZE = 1 << 16  # windows compared at a time in a full scan
+VERIFY_CHUNK_SIZE = 256  # candidates verified at a time by iter_hamming_verify
+PRUNE_EVERY = 8  # pattern columns between two drops of failed windows
+SCALAR_MAX_CANDIDATES = 32  # up to this many candidates are verified without NumPy
+
+
+def genome_array(t):
+    """
+    Return a uint8 NumPy view of a text, one byte per character.
+
+    A memory-mapped reference (see mappedReference) is viewed without copying;
+    other texts are encoded, so a caller verifying many reads against the same
+    genome should convert it once and pass the array to the functions below
+    (and to the matchers, as their 'genome' argument).
+
+    Parameters:
+    - t (str): The text (a str or a str-like reference view).
+
+    Returns:
+    - numpy.ndarray: The text as a uint8 array.
+    """
+
+    if isinstance(t, MappedSequence):
+        return np.frombuffer(t.buf, dtype=np.uint8, count=t.length, offset=t.offset)
+    return np.frombuffer(str(t).encode('ascii'), dtype=np.uint8)
+
+
+def _count_mismatches(pa, ta, starts, k):
+    """ Mismatch counts of the windows at 'starts', keeping only those with at most k """
+    counts = np.zeros(len(starts), dtype=np.int32)
+    for j in range(len(pa)):
+        counts += ta[starts + j] != pa[j]
+        if (j + 1) % PRUNE_EVERY == 0:
+            keep = counts <= k
+            starts, counts = starts[keep], counts[keep]
+            if len(starts) == 0:
+                break
+    keep = counts <= k
+    return starts[keep], counts[keep]
+
+
+def _window_mismatches(pa, t, starts, k):
+    """ Version of _count_mismatches that encodes only the windows at 'starts', one row each """
+    m = len(pa)
+    windows = np.frombuffer(''.join([t[s:s+m] for s in starts]).encode('ascii'), dtype=np.uint8)
+    counts = (windows.reshape(len(starts), m) != pa).sum(axis=1)
+    keep = counts <= k
+    return np.array(starts, dtype=np.int64)[keep], counts[keep]
+
+
+def _scalar_mismatches(p, t, starts, k):
+    """ Character-by-character version of _count_mismatches, for a few windows """
+    offsets, mismatches = [], []
+    for start in starts:
+        count = 0
+        for a, b in zip(p, t[start:start+len(p)]):
+            if a != b:
+                count += 1
+                if count > k:
+                    break
+        else:
+            offsets.append(start)
+            mismatches.append(count)
+    return offsets, mismatches
+
+
+def hamming_verify(p, t, candidates, k, genome=None):
+    """
+    Keep the candidate offsets where the pattern occurs with at most k mismatches.
+
+    Parameters:
+    - p (str): The pattern.
+    - t (str): The text the candidates refer to.
+    - candidates (iterable): Candidate starting offsets of 'p' in 't'. Duplicates and
+                             offsets whose window does not fit in 't' are ignored.
+    - k (int): The maximum number of mismatches allowed.
+    - genome (numpy.ndarray): genome_array(t), if the caller keeps it across calls;
+                              otherwise only the candidate windows of 't' are encoded.
+
+    Returns:
+    - tuple: A tuple containing two lists, in increasing order of offset:
+        - list: The starting positions of the occurrences.
+        - list: The number of mismatches of each occurrence.
+    """
+
+    last = len(t) - len(p)
+    starts = sorted(set(s for s in candidates if 0 <= s <= last))
+    if len(starts) <= SCALAR_MAX_CANDIDATES:
+        return _scalar_mismatches(p, t, starts, k)
+    pa = np.frombuffer(p.encode('ascii'), dtype=np.uint8)
+    if genome is None and isinstance(t, MappedSequence):
+        genome = genome_array(t)  # a view, not a copy
+    if genome is None:
+        offsets, counts = _window_mismatches(pa, t, starts, k)
+    else:
+        offsets, counts = _count_mismatches(pa, genome, np.array(starts, dtype=np.int64), k)
+    return offsets.tolist(), counts.tolist()
+
+
+def iter_hamming_verify(p, t, candidates, k, chunk_size=VERIFY_CHUNK_SIZE, genome=None):
+    """
+    Lazy version of hamming_verify for candidates that are themselves produced lazily.
+
+    Candidates are pulled and verified a chunk at a time, so a caller that stops
+    after the first occurrence only pays for the first chunk of seeding and verification.
+
+    Parameters:
+    - p (str): The pattern.
+    - t (str): The text the candidates refer to.
+    - candidates (iterable): Candidate starting offsets of 'p' in 't'; repeats are verified once.
+    - k (int): The maximum number of mismatches allowed.
+    - chunk_size (int): The number of candidates verified at a time.
+    - genome (numpy.ndarray): genome_array(t), if the caller keeps it across calls.
+
+    Returns:
+    - generator: Yields (offset, mismatches) for each occurrence, in increasing order of
+                 offset within a chunk and chunk by chunk in the order the candidates arrive.
+    """
+
+    candidates = iter(candidates)
+    seen = set()
+    while True:
+        chunk = list(itertools.islice(candidates, chunk_size))
+        if not chunk:
+            return
+        fresh = [c for c in chunk if c not in seen]
+        seen.update(fresh)
+        offsets, counts = hamming_verify(p, t, fresh, k, genome)
+        for occurrence in zip(offsets, counts):
+            yield occurrence
+
+
+def hamming_scan(p, t, k, chunk_size=CHUNK_SIZE, genome=None):
+    """
+    Find every occurrence of a pattern in a text with at most k mismatches
+    (vectorized, any-k version of naive_matching_2mm).
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+    - k (int): The maximum number of mismatches allowed.
+    - chunk_size (int): The number of windows compared at a time (bounds the memory used).
+    - genome (numpy.ndarray): genome_array(t), if the caller keeps it across calls.
+
+    Returns:
+    - tuple: A tuple containing two lists, in increasing order of offset:
+        - list: The starting positions of the occurrences.
+        - list: The number of mismatches of each occurrence.
+    """
+
+    n_windows = len(t) - len(p) + 1
+    if n_windows <= 0:
+        return [], []
+    pa = np.frombuffer(p.encode('ascii'), dtype=np.uint8)
+    ta = genome_array(t) if genome is None else genome
+    offsets, mismatches = [], []
+    for first in range(0, n_windows, chunk_size):
+        starts = np.arange(first, min(first + chunk_size, n_windows), dtype=np.int64)
+        found, counts = _count_mismatches(pa, ta, starts, k)
+        offsets.extend(found.tolist())
+        mismatches.extend(counts.tolist())
+    return offsets, mismatches
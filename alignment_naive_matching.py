@@ -1,17 +1,38 @@
 #!/usr/bin/env python
 
-def naive_matching(p,t):
+from dnaStrand import is_palindromic, iter_strands, reverseComplement, search_strands
+from matchIter import has_hit
+
+def naive_matching(p,t, strand=None):
     """
     Performs a naive exact matching algorithm to find occurrences of a pattern in a text.
 
     Parameters:
     - p (str): The pattern to search for in the text.
     - t (str): The text where the pattern is to be searched.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
 
     Returns:
-    - list: A list containing the starting positions of occurrences of the pattern in the text.
+    - list: A list containing the starting positions of occurrences of the pattern in the text,
+            or of (offset, strand) tuples when 'strand' is given.
+    """
+    if strand is not None:
+        return search_strands(lambda q: naive_matching(q, t), p, strand)
+    return list(iter_naive_matching(p, t))
+
+
+def iter_naive_matching(p, t):
+    """
+    Lazy version of naive_matching: yield each occurrence as soon as it is found,
+    so the scan can be stopped early (see matchIter).
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+
+    Returns:
+    - generator: Yields the starting positions of occurrences of the pattern in the text, in increasing order.
     """
-    occurrences = []
     for i in range(len(t) - len(p) + 1):
         match = True # Assume there is a match initially
         for j in range(len(p)):
@@ -19,25 +40,27 @@ def naive_matching(p,t):
                 match = False
                 break
         if match:
-            occurrences.append(i)
-            
-    return occurrences
+            yield i
 
 
-def naive_with_counts(p,t):
+def naive_with_counts(p,t, strand=None):
     """
     Find exact occurrences of a pattern in a text and count the number of alignments and character comparisons.
 
     Parameters:
     - p (str): The pattern to search for in the text.
     - t (str): The text where the pattern is to be searched.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
 
     Returns:
     - tuple: A tuple containing three elements:
-        - list: A list containing the starting positions of exact occurrences of the pattern in the text.
+        - list: A list containing the starting positions of exact occurrences of the pattern in the text,
+                or of (offset, strand) tuples when 'strand' is given.
         - int: The number of alignments tried.
         - int: The number of character comparisons performed.
     """
+    if strand is not None:
+        return search_strands(lambda q: naive_with_counts(q, t), p, strand)
     
     occurrences = []
     num_alignments = 0 #the number of alignments tried
@@ -57,14 +80,6 @@ def naive_with_counts(p,t):
     return occurrences, num_alignments, num_character_comparisons
 
 
-def reverseComplement(s):
-    complement = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A', 'N': 'N'}
-    t = ''
-    for base in s:
-        t = complement[base] + t
-    return t
-
-
 def naive_with_rc(p, t):
     """
     Performs naive exact matching algorithm on both forward and reverse complement strands.
@@ -91,6 +106,8 @@ def naive_with_rc(p, t):
             occurrences.append(i)
             
     # Check reverse complement strand match
+    if is_palindromic(p):
+        return occurrences, list(occurrences)  # same hits: skip the second scan
     occurrences_rc = []
     p_rc = reverseComplement(p)
     for i in range(len(t) - len(p_rc) + 1):
@@ -105,19 +122,35 @@ def naive_with_rc(p, t):
     return occurrences, occurrences_rc
 
 
-def naive_matching_2mm(p,t):
+def naive_matching_2mm(p,t, strand=None):
     """
     Finds approximate occurrences of a pattern in a text allowing up to 2 mismatches.
 
     Parameters:
     - p (str): The pattern to search for in the text.
     - t (str): The text where the pattern is to be searched.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
 
     Returns:
-    - list: A list containing the starting positions of approximate occurrences of the pattern.
+    - list: A list containing the starting positions of approximate occurrences of the pattern,
+            or of (offset, strand) tuples when 'strand' is given.
+    """
+    if strand is not None:
+        return search_strands(lambda q: naive_matching_2mm(q, t), p, strand)
+    return list(iter_naive_matching_2mm(p, t))
+
+
+def iter_naive_matching_2mm(p, t):
+    """
+    Lazy version of naive_matching_2mm: yield each approximate occurrence as soon as it is found.
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+
+    Returns:
+    - generator: Yields the starting positions of approximate occurrences of the pattern, in increasing order.
     """
-    
-    occurrences = []
     k = 2  # Number of allowed mismatches
     
     for i in range(len(t) - len(p) + 1):
@@ -128,9 +161,7 @@ def naive_matching_2mm(p,t):
                 if mismatches > k:# Break if more than k mismatches are found
                     break
         if mismatches <= k:
-            occurrences.append(i)
-            
-    return occurrences
+            yield i
 
 
 def count_matched_reads(reads, genome):
@@ -138,7 +169,7 @@ def count_matched_reads(reads, genome):
     Count the number of reads (first 30 bases/prefix) that match the genome.
 
     Args:
-    reads (list): A list of reads from the genome.
+    reads (iterable): Reads from the genome, as strings or as FASTQRecord objects such as those yielded by readFASTQ.parseFASTQ.
     genome (str): The reference genome to match against.
 
     Returns:
@@ -147,11 +178,12 @@ def count_matched_reads(reads, genome):
     numMatched = 0
     n = 0
     for r in reads:
+        if not isinstance(r, str):
+            r = r.seq  # FASTQRecord from the streaming reader
         r = r[0:30]
-        matches = naive_matching(r, genome)
-        matches.extend(naive_matching(reverseComplement(r), genome))
         n += 1
-        if len(matches) > 0:
+        # only whether a hit exists matters: stop at the first one on either strand
+        if has_hit(iter_strands(lambda q: iter_naive_matching(q, genome), r)):
             numMatched += 1
             
     return numMatched, n
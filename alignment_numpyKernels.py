@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+# NumPy versions of the dynamic programming kernels in alignment_editDistance,
+# alignment_editDistance_approximate_matching and alignment_globalAlignment.
+# Each DP row is computed with whole-array operations: the diagonal and
+# vertical moves depend only on the previous row, and the horizontal move
+# (a running minimum along the row) becomes a cumulative minimum:
+#   D[i][j] = G[j] + min(V[l] - G[l] for l <= j)
+# where V holds the best diagonal/vertical value of each cell and G[j] is the
+# cost of the first j horizontal gaps. The results are identical to the
+# pure Python functions.
+
+import numpy as np
+
+from alignment_globalAlignment import alphabet, score
+
+
+def encode(seq, alphabet=None):
+    """
+    Encode a sequence as a small-integer NumPy array.
+
+    Parameters:
+    - seq (str): The sequence to encode.
+    - alphabet (list): If given, characters are replaced by their index in 'alphabet';
+                       otherwise the array holds the raw character codes.
+
+    Returns:
+    - numpy.ndarray: The encoded sequence.
+
+    Raises:
+    - ValueError: If 'seq' contains a character that is not in 'alphabet'.
+    """
+
+    raw = np.frombuffer(seq.encode('ascii'), dtype=np.uint8)
+    if alphabet is None:
+        return raw
+    table = np.full(256, 255, dtype=np.uint8)
+    for i, c in enumerate(alphabet):
+        table[ord(c)] = i
+    codes = table[raw]
+    if (codes == 255).any():
+        raise ValueError('sequence contains characters outside the alphabet %s' % ''.join(alphabet))
+    return codes
+
+
+def _edit_rows(x, y, first_row):
+    """ Run the unit-cost edit distance recurrence and return the last row """
+    xs, ys = encode(x), encode(y)
+    steps = np.arange(len(y) + 1, dtype=np.int64)
+    row = first_row
+    for i in range(1, len(xs) + 1):
+        best = np.empty(len(ys) + 1, dtype=np.int64)
+        best[0] = i
+        # diagonal (match / mismatch) against vertical (gap in y)
+        np.minimum(row[:-1] + (ys != xs[i-1]), row[1:] + 1, out=best[1:])
+        # horizontal gaps: running minimum of best[l] + (j - l)
+        row = np.minimum.accumulate(best - steps) + steps
+    return row
+
+
+def editDistance_numpy(x, y):
+    """
+    Calculate the edit distance between two strings (NumPy version of editDistance).
+
+    Parameters:
+    - x (str): The first string.
+    - y (str): The second string.
+
+    Returns:
+    - int: The edit distance between the two strings.
+    """
+
+    first_row = np.arange(len(y) + 1, dtype=np.int64)
+    return int(_edit_rows(x, y, first_row)[-1])
+
+
+def editDistance_approximate_matching_numpy(x, y):
+    """
+    Calculate the approximate edit distance between two strings
+    (NumPy version of editDistance_approximate_matching).
+
+    Parameters:
+    - x (str): The first string (the pattern).
+    - y (str): The second string (the text).
+
+    Returns:
+    - int: The minimum approximate edit distance between the two strings.
+    """
+
+    first_row = np.zeros(len(y) + 1, dtype=np.int64)  # x may start anywhere in y
+    return int(_edit_rows(x, y, first_row).min())
+
+
+def globalAlignment_numpy(x, y, score=score, alphabet=alphabet):
+    """
+    Computes the global alignment score between two sequences x and y
+    (NumPy version of globalAlignment).
+
+    Parameters:
+    - x (str): The first sequence.
+    - y (str): The second sequence.
+    - score (list): Substitution costs indexed by alphabet position; the last row and
+                    column hold the gap costs (see alignment_globalAlignment.score).
+    - alphabet (list): The characters the rows and columns of 'score' refer to.
+
+    Returns:
+    - int: The global alignment score between sequences x and y.
+    """
+
+    matrix = np.array(score, dtype=np.int64)
+    xs, ys = encode(x, alphabet), encode(y, alphabet)
+    gap_x = matrix[xs, -1]  # cost of aligning x[i] against a gap
+    gap_y = matrix[-1, ys]  # cost of aligning y[j] against a gap
+    gaps = np.zeros(len(ys) + 1, dtype=np.int64)
+    np.cumsum(gap_y, out=gaps[1:])  # cost of the first j horizontal gaps
+
+    row = gaps.copy()
+    for i in range(len(xs)):
+        best = np.empty(len(ys) + 1, dtype=np.int64)
+        best[0] = row[0] + gap_x[i]
+        np.minimum(row[:-1] + matrix[xs[i], ys], row[1:] + gap_x[i], out=best[1:])
+        row = np.minimum.accumulate(best - gaps) + gaps
+    return int(row[-1])
@@ -1,31 +1,12 @@
 #!/usr/bin/env python
 
-import bisect
+from alignment_hammingDistance import hamming_verify, iter_hamming_verify
+from candidateFilter import diagonal_candidates
+from dnaStrand import search_strands
+from kmerIndex_binarySearch import Index
+from seedOccurrence import over_max_hits
 
-class Index(object):
-    """ Holds a substring index for a text T """
-
-    def __init__(self, t, k):
-        """ Create index from all substrings of t of length k """
-        self.k = k  # k-mer length (k)
-        self.index = []
-        for i in range(len(t) - k + 1):  # for each k-mer
-            self.index.append((t[i:i+k], i))  # add (k-mer, offset) pair
-        self.index.sort()  # alphabetize by k-mer
-
-    def query(self, p):
-        """ Return index hits for first k-mer of p """
-        kmer = p[:self.k]  # query with first k-mer
-        i = bisect.bisect_left(self.index, (kmer, -1))  # binary search
-        hits = []
-        while i < len(self.index):  # collect matching index entries
-            if self.index[i][0] != kmer:
-                break
-            hits.append(self.index[i][1])
-            i += 1
-        return hits
-
-def queryIndex_approximate_matching(p, t, n):
+def queryIndex_approximate_matching(p, t, n, index=None, strand=None, min_hits=1, stats=None, max_hits=None, genome=None):
     """
     Find approximate occurrences of a pattern in a text using an indexed search.
 
@@ -33,48 +14,87 @@ def queryIndex_approximate_matching(p, t, n):
     - p (str): The pattern to search for in the text.
     - t (str): The text where the pattern is to be searched.
     - n (int): The maximum number of mismatches allowed.
+    - index (Index): Optional prebuilt (or loaded) index of 't' whose k equals the segment length,
+                     round(len(p) / (n+1)). If omitted, an index is built for this call.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
+    - min_hits (int): The number of segment hits a diagonal needs before it is verified
+                      (see candidateFilter.diagonal_candidates).
+    - stats (dict): If given, updated with the number of 'seed_hits', distinct 'diagonals',
+                    'candidates' left for verification and verified 'occurrences'.
+    - max_hits (int): Skip seeds with more than this many index hits (see seedOccurrence).
+                      The skipped seeds are listed under 'masked_seeds' in 'stats'.
+    - genome (numpy.ndarray): Optional alignment_hammingDistance.genome_array(t), kept by a caller
+                              that verifies many reads against the same text.
 
     Returns:
     - tuple: A tuple containing two elements:
-        - list: A list containing the starting positions of approximate occurrences of the pattern in the text.
+        - list: A list containing the starting positions of approximate occurrences of the pattern in the text,
+                or (offset, strand) tuples when 'strand' is given.
         - int: The total number of hits found during the indexed search.
     """
    
     segment_length = int(round(len(p) / (n+1)))
-    all_matches = set()
-    t_index = Index(t, segment_length)
+    if index is None:
+        t_index = Index(t, segment_length)
+    elif index.k != segment_length:
+        raise ValueError('index has k=%d but the segment length is %d' % (index.k, segment_length))
+    else:
+        t_index = index
+    if strand is not None:
+        # both strands share the index: the reverse complement has the same segment length
+        return search_strands(lambda q: queryIndex_approximate_matching(q, t, n, t_index, None, min_hits, stats, max_hits, genome), p, strand)
     index_hits = 0
+    seed_hits = []
+    masked = stats.setdefault('masked_seeds', []) if stats is not None else None
     
     for i in range(n+1):
         start = i*segment_length
         end = min((i+1)*segment_length, len(p))
+        if over_max_hits(t_index, p[start:end], max_hits, masked):
+            continue  # repetitive segment: leave it to the other segments
         matches = t_index.query(p[start:end])
             
-        # Check if the match is within bounds
-        for m in matches:
-            index_hits += 1
-            if m < start or m-start+len(p) > len(t):
-                continue
-            
-            mismatches = 0
-            
-            # Check mismatches before the start index
-            for j in range(0, start):
-                if not p[j] == t[m-start+j]:
-                    mismatches += 1
-                    if mismatches > n:
-                        break
-            
-            # Check mismatches after the end index
-            for j in range(end, len(p)):
-                if not p[j] == t[m-start+j]:
-                    mismatches += 1
-                    if mismatches > n:
-                        break
-                        
-            # If total mismatches are within the allowed limit, add the match index to the set 
-            # m - start to get the position of text which match with the first offset of pattern
-            if mismatches <= n:
-                all_matches.add(m - start)
+        index_hits += len(matches)
+        seed_hits.extend((m, start) for m in matches)
                 
-    return list(all_matches), index_hits
+    # m - start to get the position of text which match with the first offset of pattern;
+    # each diagonal is verified once, however many segments point to it
+    candidates = diagonal_candidates(seed_hits, min_hits, stats)
+    occurrences = hamming_verify(p, t, candidates, n, genome)[0]
+    if stats is not None:
+        stats['occurrences'] = stats.get('occurrences', 0) + len(occurrences)
+    return occurrences, index_hits
+
+
+def iter_queryIndex_approximate_matching(p, t, n, index=None, max_hits=None, genome=None):
+    """
+    Lazy version of queryIndex_approximate_matching: the segments are looked up and their
+    candidates verified a chunk at a time, so the work stops with the caller (see matchIter).
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+    - n (int): The maximum number of mismatches allowed.
+    - index (Index): Optional prebuilt (or loaded) index of 't' whose k equals the segment length.
+    - max_hits (int): Skip segments with more than this many index hits (see seedOccurrence).
+    - genome (numpy.ndarray): Optional alignment_hammingDistance.genome_array(t), kept by a caller
+                              that verifies many reads against the same text.
+
+    Returns:
+    - generator: Yields each starting position of an approximate occurrence once, in the order found.
+    """
+
+    segment_length = int(round(len(p) / (n+1)))
+    if index is None:
+        index = Index(t, segment_length)
+    elif index.k != segment_length:
+        raise ValueError('index has k=%d but the segment length is %d' % (index.k, segment_length))
+
+    def candidates():
+        for i in range(n+1):
+            start = i*segment_length
+            end = min((i+1)*segment_length, len(p))
+            for m in index.query(p[start:end], max_hits):
+                yield m - start
+    for offset, _ in iter_hamming_verify(p, t, candidates(), n, genome=genome):
+        yield offset
@@ -5,7 +5,9 @@
 # from previous Index and query functions. It compares patterns against a reference text 
 # using an index structure, ensuring alignment and similarity to validate the hits. 
 
-def queryIndex_exactMatching(p, t, index):
+from dnaStrand import search_strands
+
+def queryIndex_exactMatching(p, t, index, strand=None, max_hits=None):
     """
     Query an index to verify the correctness of hits.
     
@@ -13,16 +15,35 @@ def queryIndex_exactMatching(p, t, index):
     - p: pattern string
     - t: reference text string
     - index: index object
+    - strand: optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands)
+    - max_hits: optional cutoff; a seed with more index hits than this is skipped and yields no offsets
+    
+    Returns:
+    - offsets: list of offsets where matches occur, or of (offset, strand) tuples when strand is given
+    """
+    
+    if strand is not None:
+        return search_strands(lambda q: queryIndex_exactMatching(q, t, index, None, max_hits), p, strand)
+    
+    return list(iter_queryIndex_exactMatching(p, t, index, max_hits)) #list of offsets where it matches
+
+
+def iter_queryIndex_exactMatching(p, t, index, max_hits=None):
+    """
+    Lazy version of queryIndex_exactMatching: yield each verified hit as soon as it is checked.
+    
+    Args:
+    - p: pattern string
+    - t: reference text string
+    - index: index object
+    - max_hits: optional cutoff; a seed with more index hits than this is skipped and yields no offsets
     
     Returns:
-    - offsets: list of offsets where matches occur
+    - generator of the offsets where matches occur, in the order of the index hits
     """
     
     k = index.k #retrieves the length of k from the index object
-    offsets = [] #list of offsets where it matches
     
-    for i in index.query(p): #This loop iterates over the positions in the text where occurrences of the pattern p were found using the query method from the index object
+    for i in index.query(p, max_hits): #This loop iterates over the positions in the text where occurrences of the pattern p were found using the query method from the index object
         if p[k:] == t[i+k:i+len(p)]:#the substring of t from position i+k to i+len(p) (inclusive) is equal to the remaining part of the pattern p starting from position k
-            offsets.append(i)
-            
-    return offsets
+            yield i
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+from alignment_hammingDistance import hamming_verify
+from candidateFilter import diagonal_candidates
+from dnaStrand import search_strands
+
+def querySpacedSeed_approximate_matching(p, t, seed_index, n, strand=None, min_hits=1, stats=None, max_hits=None, genome=None):
+    """
+    Find approximate occurrences of a pattern in a text using a spaced-seed index.
+
+    Every seed mask of the index is placed at every offset of the pattern; each index
+    hit suggests one window of the text, and the distinct windows are verified once.
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+    - seed_index (SpacedSeedIndex): The spaced-seed index of the text.
+    - n (int): The maximum number of mismatches allowed.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
+    - min_hits (int): The number of seed hits a diagonal needs before it is verified
+                      (see candidateFilter.diagonal_candidates).
+    - stats (dict): If given, updated with the number of 'seed_hits', distinct 'diagonals',
+                    'candidates' left for verification and verified 'occurrences'.
+    - max_hits (int): Skip seeds with more than this many index hits (see seedOccurrence).
+                      The skipped seeds are listed under 'masked_seeds' in 'stats' as
+                      (mask id, pattern offset) tuples.
+    - genome (numpy.ndarray): Optional alignment_hammingDistance.genome_array(t), kept by a caller
+                              that verifies many reads against the same text.
+
+    Returns:
+    - tuple: A tuple containing two elements:
+        - list: A list containing the starting positions of approximate occurrences of the pattern in the text,
+                or (offset, strand) tuples when 'strand' is given.
+        - list: The index hits as (text offset, mask id, pattern offset) tuples; 'mask id' is the
+                position in seed_index.masks of the mask that produced the hit.
+    """
+
+    if strand is not None:
+        return search_strands(lambda q: querySpacedSeed_approximate_matching(q, t, seed_index, n, None, min_hits, stats, max_hits, genome), p, strand)
+
+    masked = stats.setdefault('masked_seeds', []) if stats is not None else None
+    hits = seed_index.seed_hits(p, max_hits, masked)
+    # offset - j to get the position of text which match with the first offset of pattern
+    candidates = diagonal_candidates(((offset, j) for offset, _, j in hits), min_hits, stats)
+    occurrences = hamming_verify(p, t, candidates, n, genome)[0]
+    if stats is not None:
+        stats['occurrences'] = stats.get('occurrences', 0) + len(occurrences)
+    return occurrences, hits
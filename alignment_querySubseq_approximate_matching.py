@@ -4,7 +4,12 @@
 
 import bisect
 
-def querySubseq_approximate_matching(p, t, subseq_index, n):
+from alignment_hammingDistance import hamming_verify, iter_hamming_verify
+from candidateFilter import diagonal_candidates
+from dnaStrand import search_strands
+from seedOccurrence import over_max_hits
+
+def querySubseq_approximate_matching(p, t, subseq_index, n, strand=None, min_hits=1, stats=None, max_hits=None, genome=None):
     """
     Find approximate occurrences of a pattern in a text using a subsequence index.
 
@@ -13,21 +18,37 @@ def querySubseq_approximate_matching(p, t, subseq_index, n):
     - t (str): The text where the pattern is to be searched.
     - subseq_index (SubseqIndex): The subsequence index of the text constructed using a subsequence indexing method.
     - n (int): The maximum number of mismatches allowed.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
+    - min_hits (int): The number of subsequence hits a diagonal needs before it is verified
+                      (see candidateFilter.diagonal_candidates).
+    - stats (dict): If given, updated with the number of 'seed_hits', distinct 'diagonals',
+                    'candidates' left for verification and verified 'occurrences'.
+    - max_hits (int): Skip seeds with more than this many index hits (see seedOccurrence).
+                      The skipped seeds are listed under 'masked_seeds' in 'stats'.
+    - genome (numpy.ndarray): Optional alignment_hammingDistance.genome_array(t), kept by a caller
+                              that verifies many reads against the same text.
 
     Returns:
     - tuple: A tuple containing two elements:
-        - list: A list containing the starting positions of approximate occurrences of the pattern in the text.
+        - list: A list containing the starting positions of approximate occurrences of the pattern in the text,
+                or (offset, strand) tuples when 'strand' is given.
         - list: A list containing the hits found during the subsequence indexing.
     """
 
+    if strand is not None:
+        return search_strands(lambda q: querySubseq_approximate_matching(q, t, subseq_index, n, None, min_hits, stats, max_hits, genome), p, strand)
+
     
     k = subseq_index.k 
     ival = subseq_index.ival
     span = subseq_index.span
-    all_matches = set()
     hits = []
+    seed_hits = []
+    masked = stats.setdefault('masked_seeds', []) if stats is not None else None
     
     for start_index in range(ival):
+        if over_max_hits(subseq_index, p[start_index:start_index+span], max_hits, masked):
+            continue  # repetitive subsequence: leave it to the other start indexes
         subseq = p[start_index:][:span:ival]
         i = bisect.bisect_left(subseq_index.index, (subseq, -1))
         
@@ -35,38 +56,41 @@ def querySubseq_approximate_matching(p, t, subseq_index, n):
             if subseq_index.index[i][0] != subseq:
                 break
             hits.append(subseq_index.index[i][1])
+            seed_hits.append((subseq_index.index[i][1], start_index))
             i += 1
                 
-     # Check if the match is within bounds
-        for m in hits:
-            if m < start_index or m-start_index+len(p) > len(t):
-                continue
-            mismatches = 0
-            
-            # Check mismatches before the start index
-            for j in range(0, start_index):
-                if not p[j] == t[m-start_index+j]:
-                    mismatches += 1
-                    if mismatches > n:
-                        break
-            
-            # Check mismatches after the end index
-            for j in range(span, len(p)):
-                if not p[j] == t[m-start_index+j]:
-                    mismatches += 1
-                    if mismatches > n:
-                        break
-            
-            # Check mismatches in the hit
-            for j in range(start_index, span):
-                if not p[j] == t[m-start_index+j]:
-                    mismatches += 1
-                    if mismatches > n:
-                        break
-                        
-            # If total mismatches are within the allowed limit, add the match index to the set 
-            # m - start to get the position of text which match with the first offset of pattern
-            if mismatches <= n:
-                all_matches.add(m - start_index)
-                
-    return list(all_matches), hits
+    # m - start to get the position of text which match with the first offset of pattern;
+    # each hit is paired with its own start index and each diagonal is verified once
+    candidates = diagonal_candidates(seed_hits, min_hits, stats)
+    occurrences = hamming_verify(p, t, candidates, n, genome)[0]
+    if stats is not None:
+        stats['occurrences'] = stats.get('occurrences', 0) + len(occurrences)
+    return occurrences, hits
+
+
+def iter_querySubseq_approximate_matching(p, t, subseq_index, n, max_hits=None, genome=None):
+    """
+    Lazy version of querySubseq_approximate_matching: the subsequences are looked up and their
+    candidates verified a chunk at a time, so the work stops with the caller (see matchIter).
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+    - subseq_index (SubseqIndex): The subsequence index of the text constructed using a subsequence indexing method.
+    - n (int): The maximum number of mismatches allowed.
+    - max_hits (int): Skip subsequences with more than this many index hits (see seedOccurrence).
+    - genome (numpy.ndarray): Optional alignment_hammingDistance.genome_array(t), kept by a caller
+                              that verifies many reads against the same text.
+
+    Returns:
+    - generator: Yields each starting position of an approximate occurrence once, in the order found.
+    """
+
+    span = subseq_index.span
+
+    def candidates():
+        for start_index in range(subseq_index.ival):
+            for m in subseq_index.query(p[start_index:start_index+span], max_hits):
+                yield m - start_index
+    for offset, _ in iter_hamming_verify(p, t, candidates(), n, genome=genome):
+        yield offset
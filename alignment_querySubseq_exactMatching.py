@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
-def querySubseq_exactMatching(p, t, subseq_index):
+from dnaStrand import search_strands
+
+def querySubseq_exactMatching(p, t, subseq_index, strand=None, max_hits=None):
     """
     Find occurrences of a pattern in a text using a subsequence index.
 
@@ -8,12 +10,18 @@ def querySubseq_exactMatching(p, t, subseq_index):
     - p (str): The pattern to search for in the text.
     - t (str): The text where the pattern is to be searched.
     - subseq_index (SubseqIndex): The subsequence index of the text constructed using a subsequence indexing method.
+    - strand (str): Optional '+', '-' or 'both' to search the given strand(s) (see dnaStrand.search_strands).
+    - max_hits (int): Optional cutoff; a subsequence with more index hits than this is skipped.
 
     Returns:
     - tuple: A tuple containing two elements:
-        - list: A list containing the starting positions of occurrences of the pattern in the text.
+        - list: A list containing the starting positions of occurrences of the pattern in the text,
+                or (offset, strand) tuples when 'strand' is given.
         - int: The number of hits found during the subsequence indexing.
     """
+
+    if strand is not None:
+        return search_strands(lambda q: querySubseq_exactMatching(q, t, subseq_index, None, max_hits), p, strand)
     
     k = subseq_index.k 
     ival = subseq_index.ival
@@ -21,9 +29,29 @@ def querySubseq_exactMatching(p, t, subseq_index):
     hits = 0
     
     for start_index in range(ival):
-        for i in subseq_index.query(p[start_index:]):
+        for i in subseq_index.query(p[start_index:], max_hits):
             hits += 1
             if p[:] == t[i:i + len(p)]:
                 occurrences.append(i)
     
     return occurrences, hits
+
+
+def iter_querySubseq_exactMatching(p, t, subseq_index, max_hits=None):
+    """
+    Lazy version of querySubseq_exactMatching: yield each occurrence as soon as it is verified.
+
+    Parameters:
+    - p (str): The pattern to search for in the text.
+    - t (str): The text where the pattern is to be searched.
+    - subseq_index (SubseqIndex): The subsequence index of the text constructed using a subsequence indexing method.
+    - max_hits (int): Optional cutoff; a subsequence with more index hits than this is skipped.
+
+    Returns:
+    - generator: Yields the starting positions of occurrences of the pattern in the text.
+    """
+
+    for start_index in range(subseq_index.ival):
+        for i in subseq_index.query(p[start_index:], max_hits):
+            if p == t[i:i + len(p)]:
+                yield i
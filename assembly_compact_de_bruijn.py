@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+
+# Compact de Bruijn graph over a stream of reads.
+# Every k-mer of the reads is an edge from its first to its last (k-1)-mer.
+# K-mers are kept as 2-bit integer codes (see kmerEncoding) in one sorted
+# NumPy array, with a parallel array of counts holding the multiplicity of
+# each edge, so the graph costs 12 bytes per distinct k-mer and no node or
+# edge is ever stored as a string. Nodes are implicit: the (k-1)-mer codes
+# code >> 2 (start) and code & node_mask (end). The successors of a node are
+# one contiguous slice of the sorted codes.
+# Non-branching paths (runs of nodes with one edge in and one edge out) are
+# compacted into unitigs; the links between k-mers along such paths are found
+# for all k-mers at once with sorted searches, and only the final walk along
+# them is a Python loop.
+
+from array import array
+
+import numpy as np
+
+from kmerEncoding import DECODE, decode_kmer, encode_kmer, iter_kmer_codes
+from overlapParallel import OverlapGraph
+
+CHUNK_SIZE = 1 << 20  # k-mer codes counted at a time
+MAX_K = 32  # a k-mer code must fit in 64 bits
+
+
+def _count_run(pending):
+    """ Sorted distinct codes of a buffer of k-mer codes, with their counts """
+    codes, counts = np.unique(np.frombuffer(pending, dtype=np.uint64), return_counts=True)
+    return codes, counts.astype(np.uint64)
+
+
+def _merge_runs(first, second):
+    """ Merge two sorted (codes, counts) runs, adding the counts of shared codes """
+    codes = np.concatenate([first[0], second[0]])
+    counts = np.concatenate([first[1], second[1]])
+    order = np.argsort(codes, kind='stable')
+    codes, counts = codes[order], counts[order]
+    if len(codes) == 0:
+        return codes, counts
+    starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+    return codes[starts], np.add.reduceat(counts, starts)  # integer sums
+
+
+def count_kmers(reads, k, chunk_size=CHUNK_SIZE):
+    """
+    Count the k-mers of a stream of reads.
+
+    Every chunk of k-mer codes is counted into a sorted run, and runs are merged
+    pairwise as soon as the newer one is as large as the one before it, so each
+    code takes part in O(log(number of chunks)) merges.
+
+    Parameters:
+    - reads (iterable): The read sequences, e.g. (record.seq for batch in parseFASTQ(path) for record in batch).
+    - k (int): The k-mer length, at most MAX_K.
+    - chunk_size (int): The number of k-mer codes counted at a time.
+
+    Returns:
+    - tuple: A tuple containing two NumPy arrays:
+        - numpy.ndarray: The distinct 2-bit k-mer codes, sorted (uint64).
+        - numpy.ndarray: The number of occurrences of each code (uint32).
+      K-mers holding characters other than A, C, G and T are not counted.
+    """
+
+    if not 1 <= k <= MAX_K:
+        raise ValueError('k must be between 1 and %d: %r' % (MAX_K, k))
+    runs = [(np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64))]
+    pending = array('Q')
+    for read in reads:
+        pending.extend(code for _, code in iter_kmer_codes(read, k))
+        if len(pending) >= chunk_size:
+            runs.append(_count_run(pending))
+            pending = array('Q')
+            while len(runs) > 1 and len(runs[-2][0]) <= len(runs[-1][0]):
+                second = runs.pop()
+                runs.append(_merge_runs(runs.pop(), second))
+    if pending:
+        runs.append(_count_run(pending))
+    while len(runs) > 1:
+        second = runs.pop()
+        runs.append(_merge_runs(runs.pop(), second))
+    codes, counts = runs[0]
+    return codes, counts.astype(np.uint32)
+
+
+class CompactDeBruijnGraph(object):
+    """ Holds a de Bruijn graph of (k-1)-mer nodes and k-mer edges, built from a stream of reads.
+
+        Edges are the distinct k-mers of the reads, stored as sorted 2-bit
+        codes with their multiplicities; k-mers seen fewer than min_count
+        times (most of them sequencing errors) are dropped. """
+
+    def __init__(self, reads, k, min_count=1, chunk_size=CHUNK_SIZE):
+        """ Count the k-mers of reads and keep those seen at least min_count times """
+        self.k = k
+        self.node_mask = (1 << (2 * (k - 1))) - 1
+        codes, counts = count_kmers(reads, k, chunk_size)
+        keep = counts >= min_count
+        self.codes = codes[keep]  # edges: sorted k-mer codes
+        self.counts = counts[keep]  # edge multiplicities
+
+    def num_edges(self):
+        """ Return the number of distinct k-mers """
+        return len(self.codes)
+
+    def num_nodes(self):
+        """ Return the number of distinct (k-1)-mers """
+        return len(np.union1d(self.codes >> np.uint64(2), self.codes & np.uint64(self.node_mask)))
+
+    def multiplicity(self, kmer):
+        """ Return the number of times k-mer was seen (0 if it was not, or was dropped) """
+        code = encode_kmer(kmer)
+        if code is None or len(kmer) != self.k:
+            return 0
+        i = int(np.searchsorted(self.codes, np.uint64(code)))
+        if i < len(self.codes) and int(self.codes[i]) == code:
+            return int(self.counts[i])
+        return 0
+
+    def edges(self):
+        """ Return an iterator over the (left (k-1)-mer, right (k-1)-mer, multiplicity) edges """
+        for code, count in zip(self.codes.tolist(), self.counts.tolist()):
+            kmer = decode_kmer(code, self.k)
+            yield kmer[:-1], kmer[1:], count
+
+    def _links(self):
+        """ For every k-mer, the index of its only successor and of its only predecessor
+            (-1 where the node in between has more than one edge in or out) """
+        starts = self.codes >> np.uint64(2)
+        ends = self.codes & np.uint64(self.node_mask)
+        sorted_ends = np.sort(ends)
+
+        # degrees of the nodes at both ends of every k-mer, from the two sorted orders
+        out_lo = np.searchsorted(starts, ends, side='left')
+        out_hi = np.searchsorted(starts, ends, side='right')
+        in_lo = np.searchsorted(sorted_ends, ends, side='left')
+        in_hi = np.searchsorted(sorted_ends, ends, side='right')
+        through_end = (out_hi - out_lo == 1) & (in_hi - in_lo == 1)  # end node has one edge in and one out
+
+        successor = np.where(through_end, out_lo, -1)
+        predecessor = np.full(len(self.codes), -1, dtype=np.int64)
+        predecessor[successor[through_end]] = np.nonzero(through_end)[0]
+        return successor, predecessor
+
+    def unitigs(self):
+        """
+        Compact the non-branching paths of the graph into unitigs.
+
+        Returns:
+        - list: (sequence, mean multiplicity) tuples, one per unitig. Every k-mer lies on
+                exactly one unitig; isolated cycles are cut at their smallest k-mer.
+        """
+
+        successor, predecessor = self._links()
+        successor = successor.tolist()
+        codes = self.codes.tolist()
+        counts = self.counts.tolist()
+        visited = [False] * len(codes)
+        starts = [i for i, p in enumerate(predecessor.tolist()) if p == -1]
+        starts += range(len(codes))  # k-mers left after the paths lie on cycles
+        unitigs = []
+        for first in starts:
+            if visited[first]:
+                continue
+            bases = [decode_kmer(codes[first], self.k)]
+            total = 0
+            length = 0
+            i = first
+            while i != -1 and not visited[i]:
+                visited[i] = True
+                if i != first:
+                    bases.append(DECODE[codes[i] & 3])  # each next k-mer adds its last base
+                total += counts[i]
+                length += 1
+                i = successor[i]
+            unitigs.append((''.join(bases), float(total) / length))
+        return unitigs
+
+
+def unitig_graph(unitigs, k):
+    """
+    Link unitigs whose last (k-1)-mer is the first (k-1)-mer of another.
+
+    Parameters:
+    - unitigs (list): Unitig sequences, or (sequence, multiplicity) tuples as returned by
+                      CompactDeBruijnGraph.unitigs.
+    - k (int): The k-mer length the unitigs were built with.
+
+    Returns:
+    - OverlapGraph: One edge of length k - 1 per link, between unitig IDs (list indices).
+    """
+
+    sequences = [u if isinstance(u, str) else u[0] for u in unitigs]
+    starting = {}  # first (k-1)-mer -> IDs of the unitigs starting with it
+    for j, seq in enumerate(sequences):
+        starting.setdefault(seq[:k-1], []).append(j)
+    graph = OverlapGraph(len(sequences))
+    for i, seq in enumerate(sequences):
+        following = starting.get(seq[len(seq)-k+1:], [])
+        graph.add_edges([i] * len(following), following, [k - 1] * len(following))
+    return graph
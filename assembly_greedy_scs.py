@@ -1,29 +1,9 @@
 #!/usr/bin/env python
 
-def overlap(a, b, min_length=3):
-    """
-    Return the length of the longest suffix of string 'a' matching
-    a prefix of string 'b' that is at least 'min_length' characters long.
-    If no such overlap exists, return 0.
+import heapq
 
-    Parameters:
-    - a (str): First string.
-    - b (str): Second string.
-    - min_length (int): Minimum length of overlap required.
+from overlapEngine import overlap
 
-    Returns:
-    - int: Length of the longest overlap between 'a' and 'b'.
-    """
-    
-    start = 0  # start all the way at the left
-    while True:
-        start = a.find(b[:min_length], start)  # look for b's prefix in a
-        if start == -1:  # no more occurrences to right
-            return 0
-        # found occurrence; check for full suffix/prefix match
-        if b.startswith(a[start:]):
-            return len(a)-start
-        start += 1  # move just past previous match
 
 def pick_maximal_overlap_kmer(reads, k):
     """
@@ -81,3 +61,98 @@ def greedy_scs(reads, k):
         reada, readb, overlap_length = pick_maximal_overlap_kmer(reads, k)
         
     return ''.join(reads) #the remaining reads will be those that are not overlap, so we merge them
+
+
+def greedy_scs_incremental(reads, k):
+    """
+    Construct a shortest common superstring (SCS) using a greedy algorithm, computing
+    each overlap once (same result as greedy_scs when no two overlaps tie).
+
+    All overlaps of at least k are computed once and kept in a max-heap keyed by length.
+    When two reads are merged, the heap entries that involve either of them become stale
+    and are skipped when popped, and only the overlaps of the merged read are computed.
+    Reads are handled by ID: the input list is not modified.
+
+    Candidate partners come from each read's first and last k-mer: b can follow a only
+    if the first k-mer of b occurs in a, and only near its end, since the overlap is no
+    longer than b.
+
+    Parameters:
+    - reads (list): A list of reads.
+    - k (int): Length of k-mer to use for finding overlaps.
+
+    Returns:
+    - str: The shortest common superstring constructed from the input reads.
+    """
+
+    seqs = list(reads)  # read ID -> sequence; merged reads get new IDs
+    alive = [True] * len(seqs)
+    first_kmers = {}  # first k-mer -> IDs of the reads starting with it
+    last_kmers = {}  # last k-mer -> IDs of the reads ending with it
+    lengths = []  # max-heap of (-length, ID), to bound how far candidates are looked for
+    heap = []  # max-heap of (-overlap length, ID of a, ID of b)
+
+    def add(i):
+        s = seqs[i]
+        heapq.heappush(lengths, (-len(s), i))
+        if len(s) >= k:
+            first_kmers.setdefault(s[:k], set()).add(i)
+            last_kmers.setdefault(s[-k:], set()).add(i)
+
+    def longest_other(i):
+        """ Length of the longest live read other than i """
+        while not alive[lengths[0][1]]:
+            heapq.heappop(lengths)
+        if lengths[0][1] != i:
+            return -lengths[0][0]
+        top = heapq.heappop(lengths)
+        while lengths and not alive[lengths[0][1]]:
+            heapq.heappop(lengths)
+        longest = -lengths[0][0] if lengths else 0
+        heapq.heappush(lengths, top)
+        return longest
+
+    def push(a, b):
+        if seqs[a] != seqs[b]:  # like greedy_scs, identical reads are never merged
+            overlap_length = overlap(seqs[a], seqs[b], min_length=k)
+            if overlap_length > 0:
+                heapq.heappush(heap, (-overlap_length, a, b))
+
+    def neighbours(i):
+        """ IDs of the reads that may follow read i, and of those that may precede it """
+        s = seqs[i]
+        reach = min(longest_other(i), len(s))  # no overlap with another read is longer than this
+        right, left = set(), set()
+        for j in range(len(s) - reach, len(s) - k + 1):  # b follows s: b's first k-mer is near the end of s
+            right.update(first_kmers.get(s[j:j+k], ()))
+        for j in range(0, reach - k + 1):  # a precedes s: a's last k-mer is near the start of s
+            left.update(last_kmers.get(s[j:j+k], ()))
+        right.discard(i)
+        left.discard(i)
+        return right, left
+
+    for i in range(len(seqs)):
+        add(i)
+    for i in range(len(seqs)):
+        for b in neighbours(i)[0]:  # every pair is found once, from its left read
+            push(i, b)
+
+    while heap:
+        overlap_length, a, b = heapq.heappop(heap)
+        if not (alive[a] and alive[b]):
+            continue  # one of the reads was merged since this overlap was computed
+        alive[a] = alive[b] = False
+        seqs.append(seqs[a] + seqs[b][-overlap_length:])
+        alive.append(True)
+        c = len(seqs) - 1
+        add(c)
+        right, left = neighbours(c)
+        for x in right:
+            if alive[x]:
+                push(c, x)
+        for x in left:
+            if alive[x]:
+                push(x, c)
+
+    # unmerged reads in input order, then merged reads in the order they were made, like greedy_scs
+    return ''.join([s for s, live in zip(seqs, alive) if live])
@@ -1,31 +1,136 @@
 #!/usr/bin/env python
 
-import itertools
+# Exact shortest common superstring.
+# The superstring built from an ordering of the strings is as short as the
+# sum of the overlaps between consecutive strings is large, so the SCS is the
+# ordering with the largest total overlap. Instead of trying every
+# permutation, the pairwise overlaps are computed once and the best ordering
+# is found by dynamic programming over subsets (Held-Karp): for every subset
+# S and string i in S, best[S][i] is the largest total overlap of an ordering
+# of S that starts with i,
+#   best[S][i] = max(overlap[i][j] + best[S - {i}][j] for j in S - {i})
+# Each popcount layer of subsets is computed with whole-array operations.
+# This takes O(2^n n^2) time and O(2^n n) memory instead of O(n! n), and the
+# table also gives back every optimal ordering. A branch-and-bound search
+# (scs_branch_and_bound) avoids the exponential table when the overlaps make
+# most orderings easy to rule out.
 
-def overlap(a, b, min_length=3):
+import numpy as np
+
+from overlapEngine import overlap
+
+NO_ORDERING = -(1 << 30)  # best[S][i] when i is not in S
+
+
+def overlap_matrix(string_set):
+    """
+    Compute the overlap of every ordered pair of strings once.
+
+    Parameters:
+    - string_set (list): A list of strings.
+
+    Returns:
+    - list: A list of lists where entry [i][j] is the length of the longest suffix of
+            string i matching a prefix of string j (0 on the diagonal).
+    """
+
+    return [[overlap(a, b, min_length=1) if i != j else 0 for j, b in enumerate(string_set)]
+            for i, a in enumerate(string_set)]
+
+
+def held_karp(overlaps):
+    """
+    Compute the largest total overlap of every ordering of every subset of the strings.
+
+    Parameters:
+    - overlaps (list): The overlap matrix of the strings (see overlap_matrix).
+
+    Returns:
+    - numpy.ndarray: A (2^n, n) array where entry [S][i] is the largest total overlap of
+                     an ordering of the strings in bit set S that starts with string i,
+                     or NO_ORDERING if i is not in S.
+    """
+
+    n = len(overlaps)
+    matrix = np.array(overlaps, dtype=np.int32).reshape(n, n)
+    masks = np.arange(1 << n, dtype=np.int64)
+    sizes = np.zeros(1 << n, dtype=np.int8)
+    for i in range(n):
+        sizes += ((masks >> i) & 1).astype(np.int8)
+    best = np.full((1 << n, n), NO_ORDERING, dtype=np.int32)
+    for i in range(n):
+        best[1 << i, i] = 0
+    for size in range(2, n + 1):  # every subset of a layer only depends on the previous layer
+        layer = masks[sizes == size]
+        for i in range(n):
+            with_i = layer[((layer >> i) & 1) == 1]
+            rest = with_i ^ (1 << i)
+            best[with_i, i] = (best[rest] + matrix[i]).max(axis=1)  # strings outside 'rest' stay negative
+    return best
+
+
+def iter_optimal_orderings(string_set):
     """
-    Return the length of the longest suffix of string 'a' matching
-    a prefix of string 'b' that is at least 'min_length' characters long.
-    If no such overlap exists, return 0.
+    Generate every ordering of the strings with the largest total overlap.
 
     Parameters:
-    - a (str): First string.
-    - b (str): Second string.
-    - min_length (int): Minimum length of overlap required.
+    - string_set (list): A list of strings.
 
     Returns:
-    - int: Length of the longest overlap between 'a' and 'b'.
+    - generator: Yields tuples of string indices, in the order itertools.permutations
+                 would produce them.
     """
-    
-    start = 0  # start all the way at the left
-    while True:
-        start = a.find(b[:min_length], start)  # look for b's prefix in a
-        if start == -1:  # no more occurrences to right
-            return 0
-        # found occurrence; check for full suffix/prefix match
-        if b.startswith(a[start:]):
-            return len(a)-start
-        start += 1  # move just past previous match
+
+    n = len(string_set)
+    if n == 0:
+        return
+    overlaps = overlap_matrix(string_set)
+    best = held_karp(overlaps)
+    full = (1 << n) - 1
+    top = best[full].tolist()
+    target = max(top)
+
+    def extend(ordering, mask, i, total):
+        """ Orderings of the strings in 'mask' that start with i and reach 'total' """
+        if mask == 1 << i:
+            yield tuple(ordering)
+            return
+        rest = mask ^ (1 << i)
+        row = best[rest].tolist()
+        for j in range(n):
+            if (rest >> j) & 1 and overlaps[i][j] + row[j] == total:
+                ordering.append(j)
+                for found in extend(ordering, rest, j, row[j]):
+                    yield found
+                ordering.pop()
+
+    for i in range(n):
+        if top[i] == target:
+            for ordering in extend([i], full, i, target):
+                yield ordering
+
+
+def superstring(string_set, ordering, overlaps=None):
+    """
+    Build the superstring of the strings taken in a given order.
+
+    Parameters:
+    - string_set (list): A list of strings.
+    - ordering (sequence): The indices of the strings, in order.
+    - overlaps (list): The overlap matrix of the strings; computed on demand if not given.
+
+    Returns:
+    - str: Each string appended without the part that overlaps the previous one.
+    """
+
+    pieces = [string_set[ordering[0]]]
+    for i, j in zip(ordering, ordering[1:]):
+        if overlaps is not None:
+            overlap_length = overlaps[i][j]
+        else:
+            overlap_length = overlap(string_set[i], string_set[j], min_length=1)
+        pieces.append(string_set[j][overlap_length:])  # append the part of the next string which is not overlap
+    return ''.join(pieces)
 
 
 def scs(string_set):
@@ -36,21 +141,13 @@ def scs(string_set):
     - string_set (list): A list of strings from which the shortest common superstring is to be found.
 
     Returns:
-    - str: The shortest common superstring among all permutations of `string_set`, or `None` if no common superstring is found.
-    """
-    
-    shortest_superstring = None
-    
-    for permutation in itertools.permutations(string_set): # loop through every permutations 
-        superstring = permutation[0] #the superstring start with the first string in the permutation list
-        
-        for i in range(len(string_set) - 1): # -1 because we skip the first string
-            overlap_length = overlap(permutation[i], permutation[i+1], min_length=1)
-            superstring += permutation[i+1][overlap_length:] #append with the part of the next string which is not overlap
-        if shortest_superstring is None or len(superstring) < len(shortest_superstring):
-            shortest_superstring = superstring
-            
-    return shortest_superstring
+    - str: The shortest common superstring among all permutations of `string_set` (the first one in
+           permutation order on ties), or `None` if `string_set` is empty.
+    """
+
+    for ordering in iter_optimal_orderings(string_set):
+        return superstring(string_set, ordering)
+    return None
 
 
 def scs_list(string_set):
@@ -61,25 +158,87 @@ def scs_list(string_set):
     - string_set (list): A list of strings.
 
     Returns:
-    - list: A list containing the shortest common superstring(s) of the input strings.
-    """
-    
-    list_shortest_superstring = []
-    shortest_superstring = None
-    shortest_superstring_length = float('inf')
-
-    for permutation in itertools.permutations(string_set):
-        superstring = permutation[0]
-        
-        for i in range(len(string_set) - 1):
-            overlap_length = overlap(permutation[i], permutation[i + 1], min_length=1)
-            superstring += permutation[i + 1][overlap_length:]
-
-        if len(superstring) < shortest_superstring_length:
-            shortest_superstring = superstring
-            shortest_superstring_length = len(superstring)
-            list_shortest_superstring = [shortest_superstring]
-        elif len(superstring) == shortest_superstring_length:
-            list_shortest_superstring.append(superstring)
-
-    return list_shortest_superstring
+    - list: A list containing the shortest common superstring(s) of the input strings, one per
+            optimal permutation, in permutation order.
+    """
+
+    return [superstring(string_set, ordering) for ordering in iter_optimal_orderings(string_set)]
+
+
+def greedy_ordering_overlap(overlaps):
+    """
+    Total overlap of the ordering built by greedily joining the largest overlaps.
+
+    Parameters:
+    - overlaps (list): The overlap matrix of the strings (see overlap_matrix).
+
+    Returns:
+    - int: The total overlap of a valid ordering, so a lower bound on the best one.
+    """
+
+    n = len(overlaps)
+    head = list(range(n))  # string at the end of a chain -> string at its start
+    tail = list(range(n))  # string at the start of a chain -> string at its end
+    has_next = [False] * n
+    has_previous = [False] * n
+    edges = sorted(((overlaps[i][j], i, j) for i in range(n) for j in range(n) if i != j), reverse=True)
+    total = 0
+    for length, i, j in edges:
+        if length == 0:
+            break
+        if has_next[i] or has_previous[j] or head[i] == j:  # i must end a chain, j start another one
+            continue
+        has_next[i] = has_previous[j] = True
+        start, end = head[i], tail[j]
+        tail[start] = end
+        head[end] = start
+        total += length
+    return total
+
+
+def scs_branch_and_bound(string_set):
+    """
+    Find the shortest common superstring by branch and bound over the orderings of the strings.
+
+    Orderings are extended one string at a time in permutation order. A partial ordering is
+    abandoned as soon as its overlap so far, plus the largest incoming overlap of every string
+    still to place, cannot reach the best total overlap known, starting from the greedy ordering.
+    Unlike held_karp, no exponential table is kept.
+
+    Parameters:
+    - string_set (list): A list of strings.
+
+    Returns:
+    - str: The same superstring as scs, or `None` if `string_set` is empty.
+    """
+
+    n = len(string_set)
+    if n == 0:
+        return None
+    overlaps = overlap_matrix(string_set)
+    best_in = [max([overlaps[i][j] for i in range(n) if i != j] or [0]) for j in range(n)]
+    best = [greedy_ordering_overlap(overlaps), None]  # [best total overlap, its ordering]
+    ordering = []
+    placed = [False] * n
+
+    def search(i, total, bound):
+        if len(ordering) == n:
+            if total > best[0] or (total == best[0] and best[1] is None):
+                best[0], best[1] = total, tuple(ordering)
+            return
+        for j in range(n):
+            if not placed[j] and total + bound >= best[0]:
+                placed[j] = True
+                ordering.append(j)
+                search(j, total + overlaps[i][j], bound - best_in[j])
+                ordering.pop()
+                placed[j] = False
+
+    bound = sum(best_in)
+    for i in range(n):
+        placed[i] = True
+        ordering.append(i)
+        search(i, 0, bound - best_in[i])
+        ordering.pop()
+        placed[i] = False
+    return superstring(string_set, best[1], overlaps)
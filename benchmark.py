@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+
+# Benchmark harness for the matchers, the indexes and the DP kernels.
+# Genomes and reads are generated from a seed, so two runs with the same
+# arguments work on the same data. Every benchmark is timed (best and median
+# of a few runs) and run once more under tracemalloc for its peak memory.
+# The results are written as JSON; compare a run against a saved one with
+#   python benchmark.py --compare old.json > new.json
+# which lists every benchmark that got slower by more than the threshold.
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from alignment_ahoCorasick import AhoCorasick
+from alignment_boyer_moore_pigeonhole import bm_approximate_matching, boyer_moore, boyer_moore_compiled
+from alignment_editDistance import editDistance, editDistance_alignment, editDistance_banded
+from alignment_editDistance_approximate_matching import editDistance_approximate_matching
+from alignment_editDistance_bitParallel import myers_approximate_matching, myers_search
+from alignment_globalAlignment import globalAlignment, globalAlignment_banded, globalAlignment_hirschberg
+from alignment_hammingDistance import genome_array, hamming_scan
+from alignment_naive_matching import naive_matching, naive_matching_2mm
+from alignment_numpyKernels import (editDistance_approximate_matching_numpy, editDistance_numpy,
+                                    globalAlignment_numpy)
+from alignment_queryIndex_approximate_matching import queryIndex_approximate_matching
+from alignment_queryIndex_exactMatching import queryIndex_exactMatching
+from alignment_querySpacedSeed_approximate_matching import querySpacedSeed_approximate_matching
+from alignment_querySubseq_approximate_matching import querySubseq_approximate_matching
+from bm_preproc import BoyerMoore
+from dnaStrand import reverseComplement
+from fmIndex import FMIndex
+from kmerIndex_binarySearch import Index
+from kmerIndex_hashed import HashedIndex
+from minimizerIndex import MinimizerIndex
+from spacedSeedIndex import SpacedSeedIndex
+from subSeqIndex_binarySearch import SubseqIndex
+
+BENCHMARK_VERSION = 1  # bump when benchmarks are added or changed, so old results are not compared blindly
+SEED_MASKS = ['110101100110111', '111001010110011']
+
+
+def random_genome(n, seed):
+    """ Return a uniformly random ACGT genome of length n """
+    rng = random.Random(seed)
+    return ''.join(rng.choice('ACGT') for _ in range(n))
+
+
+def _mutate(s, rate, rng, indel_rate=0.0):
+    """ Copy s with substitutions (and optionally insertions/deletions) at the given per-base rates """
+    out = []
+    for c in s:
+        x = rng.random()
+        if x < indel_rate / 2:
+            continue  # deletion
+        if x < indel_rate:
+            out.append(rng.choice('ACGT'))  # insertion before c
+        if rng.random() < rate:
+            c = rng.choice('ACGT'.replace(c, '')) if c in 'ACGT' else c
+        out.append(c)
+    return ''.join(out)
+
+
+def repeat_genome(n, seed, repeat_fraction=0.5):
+    """
+    Return a repeat-rich genome of length n.
+
+    Parameters:
+    - n (int): The genome length.
+    - seed (int): The random seed.
+    - repeat_fraction (float): The approximate fraction of the genome made of repeats.
+
+    Returns:
+    - str: A random background in which about 'repeat_fraction' of the bases are
+           diverged copies (2% substitutions) of a few interspersed repeat families,
+           forward or reverse complemented, and short tandem repeats (poly-A, CA, AGG, TTAGGG).
+    """
+
+    rng = random.Random(seed)
+    families = [''.join(rng.choice('ACGT') for _ in range(rng.randint(200, 1200))) for _ in range(4)]
+    tandem_units = ['A', 'CA', 'AGG', 'TTAGGG']
+    pieces = []
+    length = 0
+    while length < n:
+        x = rng.random()
+        if x < repeat_fraction * 0.8:
+            piece = _mutate(rng.choice(families), 0.02, rng)
+            if rng.random() < 0.5:
+                piece = reverseComplement(piece)
+        elif x < repeat_fraction:
+            unit = rng.choice(tandem_units)
+            piece = unit * (rng.randint(20, 200) // len(unit))
+        else:
+            piece = ''.join(rng.choice('ACGT') for _ in range(rng.randint(100, 1000)))
+        pieces.append(piece)
+        length += len(piece)
+    return ''.join(pieces)[:n]
+
+
+def simulate_reads(genome, n_reads, length, error_rate, seed, indel_rate=0.0):
+    """
+    Sample reads from a genome and add sequencing errors.
+
+    Parameters:
+    - genome (str): The genome to sample from.
+    - n_reads (int): The number of reads.
+    - length (int): The read length before errors.
+    - error_rate (float): The per-base substitution rate.
+    - seed (int): The random seed.
+    - indel_rate (float): The per-base insertion/deletion rate.
+
+    Returns:
+    - list: (true offset, read) tuples.
+    """
+
+    rng = random.Random(seed)
+    reads = []
+    for _ in range(n_reads):
+        offset = rng.randrange(len(genome) - length + 1)
+        reads.append((offset, _mutate(genome[offset:offset + length], error_rate, rng, indel_rate)))
+    return reads
+
+
+# Each benchmark is (group, name, setup). setup(data) does the untimed preparation
+# (e.g. building an index to be queried) and returns the function that is timed.
+
+def _bm_search(g, reads):
+    preprocessed = [(r, BoyerMoore(r, 'ACGT')) for r in reads]
+    return lambda: [boyer_moore(r, p_bm, g) for r, p_bm in preprocessed]
+
+
+def _hamming_scan(g, reads, k):
+    genome = genome_array(g)  # converted once, as a mapper would
+    return lambda: [hamming_scan(r, g, k, genome=genome) for r in reads]
+
+
+def _index_query(cls, query, *args):
+    def setup(d):
+        index = cls(d['genome'], *args)
+        return lambda: [query(r, d['genome'], index) for r in d['reads']]
+    return setup
+
+
+def _bm_approximate(g, reads, n):
+    genome = genome_array(g)
+    return lambda: [bm_approximate_matching(r, g, n, genome=genome) for r in reads]
+
+
+def _approximate_query(cls, query, *args):
+    def setup(d):
+        index = cls(d['genome'], *args)
+        genome = genome_array(d['genome'])
+        return lambda: [query(r, d['genome'], index, d['mismatches'], genome=genome) for r in d['reads']]
+    return setup
+
+
+MATCHER_BENCHMARKS = [
+    ('match', 'naive_matching', lambda d: lambda: [naive_matching(r, d['genome']) for r in d['reads']]),
+    ('match', 'boyer_moore', lambda d: _bm_search(d['genome'], d['reads'])),
+    ('match', 'boyer_moore_compiled', lambda d: lambda: [boyer_moore_compiled(r, d['genome']) for r in d['reads']]),
+    ('match', 'aho_corasick', lambda d: lambda: list(AhoCorasick(d['reads']).search(d['genome']))),
+    ('match', 'naive_matching_2mm', lambda d: lambda: [naive_matching_2mm(r, d['genome']) for r in d['reads']]),
+    ('match', 'hamming_scan', lambda d: _hamming_scan(d['genome'], d['reads'], d['mismatches'])),
+    ('match', 'bm_approximate_matching',
+     lambda d: _bm_approximate(d['genome'], d['reads'], d['mismatches'])),
+    ('match', 'myers_search', lambda d: lambda: [myers_search(r, d['genome'], d['mismatches']) for r in d['reads']]),
+    ('query', 'Index', _index_query(Index, queryIndex_exactMatching, 12)),
+    ('query', 'HashedIndex', _index_query(HashedIndex, queryIndex_exactMatching, 12)),
+    ('query', 'MinimizerIndex', _index_query(MinimizerIndex, queryIndex_exactMatching, 12, 8)),
+    ('query', 'FMIndex', _index_query(lambda g: FMIndex(g).seed_index(12), queryIndex_exactMatching)),
+    ('query', 'queryIndex_approximate_matching', lambda d: _approximate_query(
+        lambda g: Index(g, int(round(d['read_length'] / (d['mismatches'] + 1)))),
+        lambda r, g, index, n, genome: queryIndex_approximate_matching(r, g, n, index, genome=genome))(d)),
+    ('query', 'querySubseq_approximate_matching',
+     _approximate_query(SubseqIndex, querySubseq_approximate_matching, 8, 3)),
+    ('query', 'querySpacedSeed_approximate_matching',
+     _approximate_query(SpacedSeedIndex, querySpacedSeed_approximate_matching, SEED_MASKS)),
+]
+
+INDEX_BENCHMARKS = [
+    ('build', 'Index', lambda d: lambda: Index(d['genome'], 12)),
+    ('build', 'SubseqIndex', lambda d: lambda: SubseqIndex(d['genome'], 8, 3)),
+    ('build', 'HashedIndex', lambda d: lambda: HashedIndex(d['genome'], 12)),
+    ('build', 'MinimizerIndex', lambda d: lambda: MinimizerIndex(d['genome'], 12, 8)),
+    ('build', 'SpacedSeedIndex', lambda d: lambda: SpacedSeedIndex(d['genome'], SEED_MASKS)),
+    ('build', 'FMIndex', lambda d: lambda: FMIndex(d['genome'])),
+]
+
+DP_BENCHMARKS = [
+    ('dp', 'editDistance', lambda d: lambda: editDistance(d['x'], d['y'])),
+    ('dp', 'editDistance_numpy', lambda d: lambda: editDistance_numpy(d['x'], d['y'])),
+    ('dp', 'editDistance_banded', lambda d: lambda: editDistance_banded(d['x'], d['y'], d['band'])),
+    ('dp', 'editDistance_alignment', lambda d: lambda: editDistance_alignment(d['x'], d['y'])),
+    ('dp', 'editDistance_approximate_matching',
+     lambda d: lambda: editDistance_approximate_matching(d['x'], d['text'])),
+    ('dp', 'editDistance_approximate_matching_numpy',
+     lambda d: lambda: editDistance_approximate_matching_numpy(d['x'], d['text'])),
+    ('dp', 'myers_approximate_matching', lambda d: lambda: myers_approximate_matching(d['x'], d['text'])),
+    ('dp', 'globalAlignment', lambda d: lambda: globalAlignment(d['x'], d['y'])),
+    ('dp', 'globalAlignment_numpy', lambda d: lambda: globalAlignment_numpy(d['x'], d['y'])),
+    ('dp', 'globalAlignment_banded', lambda d: lambda: globalAlignment_banded(d['x'], d['y'], d['band'])),
+    ('dp', 'globalAlignment_hirschberg', lambda d: lambda: globalAlignment_hirschberg(d['x'], d['y'])),
+]
+
+
+def measure(run, repeat=3):
+    """
+    Time a function and measure its peak memory.
+
+    Parameters:
+    - run (function): The function to benchmark (called without arguments).
+    - repeat (int): The number of timed runs.
+
+    Returns:
+    - dict: 'best' and 'median' wall-clock seconds of the timed runs, and 'peak_bytes',
+            the peak of memory allocated by one more run traced with tracemalloc.
+    """
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'best': times[0], 'median': times[len(times) // 2], 'peak_bytes': peak}
+
+
+def _run_group(benchmarks, data, labels, only, repeat, log):
+    results = []
+    for group, name, setup in benchmarks:
+        if only and not any(o in name for o in only):
+            continue
+        result = dict(labels, group=group, name=name)
+        result.update(measure(setup(data), repeat))
+        if log is not None:
+            log.write('%-6s %-40s %-7s %8d  %9.4fs  %10d B\n' % (group, name, labels.get('genome', '-'),
+                                                              labels['size'], result['best'], result['peak_bytes']))
+        results.append(result)
+    return results
+
+
+def run_benchmarks(sizes, genomes=('random', 'repeat'), n_reads=20, read_length=100, error_rate=0.01,
+                   mismatches=2, dp_lengths=(100, 400), seed=1, repeat=3, only=None, log=sys.stderr):
+    """
+    Run every benchmark over a sweep of genome sizes and DP lengths.
+
+    Parameters:
+    - sizes (list): The genome sizes to sweep.
+    - genomes (list): The genome types: 'random' and/or 'repeat' (see repeat_genome).
+    - n_reads (int): The number of reads matched per benchmark.
+    - read_length (int): The read length.
+    - error_rate (float): The per-base substitution rate of the reads.
+    - mismatches (int): The number of mismatches allowed by the approximate matchers.
+    - dp_lengths (list): The sequence lengths to sweep for the DP kernels.
+    - seed (int): The random seed for genomes and reads.
+    - repeat (int): The number of timed runs per benchmark.
+    - only (list): If given, only benchmarks whose name contains one of these strings are run.
+    - log (file object): Where to write one progress line per benchmark, or None.
+
+    Returns:
+    - list: One result dict per benchmark and size (see measure), labelled with its
+            'group', 'name', 'genome' and 'size'.
+    """
+
+    results = []
+    for kind in genomes:
+        make = random_genome if kind == 'random' else repeat_genome
+        for size in sizes:
+            genome = make(size, seed)
+            reads = [r for _, r in simulate_reads(genome, n_reads, read_length, error_rate, seed + 1)]
+            data = {'genome': genome, 'reads': reads, 'read_length': read_length, 'mismatches': mismatches}
+            labels = {'genome': kind, 'size': size}
+            results.extend(_run_group(INDEX_BENCHMARKS, data, labels, only, repeat, log))
+            results.extend(_run_group(MATCHER_BENCHMARKS, data, labels, only, repeat, log))
+
+    rng = random.Random(seed)
+    for length in dp_lengths:
+        x = ''.join(rng.choice('ACGT') for _ in range(length))
+        y = _mutate(x, 0.05, rng, indel_rate=0.02)
+        text = random_genome(4 * length, seed) + x + random_genome(4 * length, seed + 1)
+        data = {'x': x, 'y': y, 'text': text, 'band': max(abs(len(x) - len(y)), length // 10)}
+        results.extend(_run_group(DP_BENCHMARKS, data, {'size': length}, only, repeat, log))
+    return results
+
+
+def _key(result):
+    return (result['group'], result['name'], result.get('genome'), result['size'])
+
+
+def compare(old, new, threshold=1.25):
+    """
+    Compare two benchmark runs.
+
+    Parameters:
+    - old (dict): A saved run (as written by main).
+    - new (dict): The current run.
+    - threshold (float): The slowdown (new best / old best) above which a benchmark is a regression.
+
+    Returns:
+    - list: (result key, old seconds, new seconds) for every regression, worst first.
+    """
+
+    before = dict((_key(r), r) for r in old['results'])
+    regressions = []
+    for r in new['results']:
+        o = before.get(_key(r))
+        if o is not None and o['best'] > 0 and r['best'] / o['best'] > threshold:
+            regressions.append((_key(r), o['best'], r['best']))
+    regressions.sort(key=lambda x: x[2] / x[1], reverse=True)
+    return regressions
+
+
+def _int_list(s):
+    return [int(x) for x in s.split(',') if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark matchers, indexes and DP kernels on synthetic genomes.')
+    parser.add_argument('--sizes', type=_int_list, default=[10000, 50000], help='comma-separated genome sizes')
+    parser.add_argument('--genomes', default='random,repeat', help="comma-separated genome types: random, repeat")
+    parser.add_argument('--reads', type=int, default=20, help='reads per matcher benchmark')
+    parser.add_argument('--read-length', type=int, default=100, help='read length')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='per-base substitution rate of the reads')
+    parser.add_argument('--mismatches', type=int, default=2, help='mismatches allowed by the approximate matchers')
+    parser.add_argument('--dp-lengths', type=_int_list, default=[100, 400], help='comma-separated DP sequence lengths')
+    parser.add_argument('--seed', type=int, default=1, help='random seed')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark')
+    parser.add_argument('--only', default=None, help='comma-separated substrings of the benchmark names to run')
+    parser.add_argument('-o', '--output', default=None, help='write the JSON results here (default: stdout)')
+    parser.add_argument('--compare', default=None, help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio reported as a regression')
+    args = parser.parse_args(argv)
+
+    for kind in args.genomes.split(','):
+        if kind not in ('random', 'repeat'):
+            parser.error('unknown genome type %r' % kind)
+    settings = {'sizes': args.sizes, 'genomes': args.genomes.split(','), 'n_reads': args.reads,
+                'read_length': args.read_length, 'error_rate': args.error_rate, 'mismatches': args.mismatches,
+                'dp_lengths': args.dp_lengths, 'seed': args.seed, 'repeat': args.repeat}
+    only = args.only.split(',') if args.only else None
+    results = run_benchmarks(only=only, **settings)
+    run = {'version': BENCHMARK_VERSION,
+           'python': platform.python_version(),
+           'platform': platform.platform(),
+           'settings': settings,
+           'results': results}
+
+    text = json.dumps(run, indent=1, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as fh:
+            fh.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+    if args.compare:
+        with open(args.compare) as fh:
+            old = json.load(fh)
+        if old.get('version') != BENCHMARK_VERSION or old.get('settings') != settings:
+            sys.stderr.write('warning: %s was run with a different benchmark version or settings\n' % args.compare)
+        regressions = compare(old, run, args.threshold)
+        for key, before, after in regressions:
+            sys.stderr.write('REGRESSION %s: %.4fs -> %.4fs (x%.2f)\n' % ('/'.join(map(str, key)), before, after, after / before))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@
 
 __author__ = "Ben Langmead"
 
+import functools
 import unittest
 
 
@@ -167,6 +168,53 @@ class BoyerMoore(object):
         return len(self.small_l_prime) - self.small_l_prime[1]
 
 
+class CompiledBoyerMoore(BoyerMoore):
+    """ BoyerMoore preprocessing flattened into a single shift table.
+
+        shift[j * (len(alphabet)+1) + c] is the combined bad character /
+        good suffix shift for a mismatch at offset j against character c;
+        the extra last column covers characters outside the alphabet. """
+
+    def __init__(self, p, alphabet='ACGT'):
+        BoyerMoore.__init__(self, p, alphabet)
+        self.p = p
+        self.width = len(alphabet) + 1
+        self.shift = []
+        for j in range(len(p)):
+            skip_gs = self.good_suffix_rule(j)
+            for ci in range(len(alphabet)):
+                skip_bc = j - (self.bad_char[j][ci]-1)
+                self.shift.append(max(1, skip_bc, skip_gs))
+            self.shift.append(max(1, j + 1, skip_gs))  # character not in p at all
+        self.full_match_shift = max(1, self.match_skip())
+
+    def search(self, t):
+        """ Return offsets of all occurrences of the pattern in t """
+        return list(self.iter_search(t))
+
+    def iter_search(self, t):
+        """ Yield offsets of occurrences of the pattern in t as they are found """
+        p, shift, width, amap = self.p, self.shift, self.width, self.amap
+        unknown = width - 1
+        m = len(p)
+        i = 0
+        while i < len(t) - m + 1:
+            j = m - 1
+            while j >= 0 and p[j] == t[i+j]:
+                j -= 1
+            if j < 0:
+                yield i
+                i += self.full_match_shift
+            else:
+                i += shift[j * width + amap.get(t[i+j], unknown)]
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_boyer_moore(p, alphabet='ACGT'):
+    """ Return a (cached) CompiledBoyerMoore for pattern p over alphabet """
+    return CompiledBoyerMoore(p, alphabet)
+
+
 class TestBoyerMoorePreproc(unittest.TestCase):
 
     def test_z_1(self):
@@ -292,5 +340,20 @@ class TestBoyerMoorePreproc(unittest.TestCase):
         self.assertEqual([0, 0, 0, 0, 0, 0, 0, 4, 4, 4, 8], big_l)
         self.assertEqual([11, 4, 4, 4, 4, 4, 4, 4, 1, 1, 1], small_l_prime)
 
+    def test_compiled_search_1(self):
+        t = 'GCTAGCTCTACGAGTCTAGGTAGGTAGCTA'
+        for p in ['GGTAGGT', 'TAG', 'CT', 'GCTA', 'AAAA']:
+            expected = [i for i in range(len(t) - len(p) + 1) if t.startswith(p, i)]
+            self.assertEqual(expected, compile_boyer_moore(p).search(t))
+
+    def test_compiled_search_2(self):
+        # characters outside the alphabet shift past the mismatch
+        t = 'NNACGTNNACGNACGT'
+        self.assertEqual([2, 12], compile_boyer_moore('ACGT').search(t))
+        self.assertEqual([18], compile_boyer_moore('meow', 'abcdefghijklmnopqrstuvwxyz ').search('pathetic pathetic meow'))
+
+    def test_compile_cache(self):
+        self.assertIs(compile_boyer_moore('GGTAGGT', 'ACGT'), compile_boyer_moore('GGTAGGT', 'ACGT'))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+# Candidate stage between seeding and verification.
+# A seed that matches text offset i at pattern offset j puts the pattern on
+# diagonal i - j, i.e. it suggests the window of the text starting at i - j.
+# Several seeds of one read often land on the same diagonal, so the hits are
+# first collapsed to distinct diagonals. Then, optionally, a diagonal is kept
+# only if at least q seeds support it: by the q-gram lemma an occurrence with
+# at most n mismatches shares at least len(p) - q + 1 - q*n of its q-grams
+# with the pattern, so a lower count cannot be a real occurrence.
+
+from collections import Counter
+
+
+def qgram_min_hits(m, q, n):
+    """
+    Return the q-gram lemma threshold for a k-mismatch search.
+
+    Parameters:
+    - m (int): The pattern length.
+    - q (int): The length of the contiguous seeds (q-grams), placed at every pattern offset.
+    - n (int): The maximum number of mismatches allowed.
+
+    Returns:
+    - int: The minimum number of q-gram hits on the diagonal of any occurrence (at least 1;
+           when the lemma gives 0 or less the filter cannot rule anything out, and the
+           caller should not rely on seeds alone).
+    """
+
+    return max(m - q + 1 - q * n, 1)
+
+
+def diagonal_candidates(hits, min_hits=1, stats=None):
+    """
+    Collapse seed hits to distinct diagonals and keep the well-supported ones.
+
+    Parameters:
+    - hits (iterable): (text offset, pattern offset) pairs, one per seed hit.
+    - min_hits (int): The number of seed hits a diagonal needs to become a candidate.
+    - stats (dict): If given, updated with the number of 'seed_hits', of distinct
+                    'diagonals' and of 'candidates' left after the min_hits filter.
+
+    Returns:
+    - list: The candidate diagonals (starting positions of the pattern in the text), in increasing order.
+    """
+
+    support = Counter(offset - j for offset, j in hits)
+    candidates = sorted(d for d, count in support.items() if count >= min_hits)
+    if stats is not None:
+        stats['seed_hits'] = stats.get('seed_hits', 0) + sum(support.values())
+        stats['diagonals'] = stats.get('diagonals', 0) + len(support)
+        stats['candidates'] = stats.get('candidates', 0) + len(candidates)
+    return candidates
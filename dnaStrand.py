@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+# Reverse complements and strand-aware searching.
+
+IUPAC = 'ACGTUMRWSYKVHDBN'
+IUPAC_COMPLEMENT = 'TGCAAKYWSRMBDHVN'
+_COMPLEMENT = str.maketrans(IUPAC + IUPAC.lower(), IUPAC_COMPLEMENT + IUPAC_COMPLEMENT.lower())
+_COMPLEMENT_BYTES = bytes.maketrans((IUPAC + IUPAC.lower()).encode('ascii'),
+                                    (IUPAC_COMPLEMENT + IUPAC_COMPLEMENT.lower()).encode('ascii'))
+
+STRANDS = ('+', '-', 'both')
+
+
+def reverseComplement(s):
+    """
+    Return the reverse complement of a DNA sequence in linear time.
+
+    Parameters:
+    - s (str or bytes): The sequence. The full IUPAC alphabet is complemented and
+                        soft-masked (lower-case) bases stay lower-case; any other
+                        character (e.g. a '-' gap) is kept as is.
+
+    Returns:
+    - str or bytes: The reverse complement, of the same type as 's'.
+    """
+
+    if isinstance(s, (bytes, bytearray)):
+        return s.translate(_COMPLEMENT_BYTES)[::-1]
+    return s.translate(_COMPLEMENT)[::-1]
+
+
+def is_palindromic(p):
+    """ True if p is its own reverse complement, so both strands give the same hits """
+    return p == reverseComplement(p)
+
+
+def search_strands(search, p, strand='both'):
+    """
+    Run a matcher on the requested strand(s) of a pattern and tag each hit with its strand.
+
+    The reverse strand is searched with the reverse complement of 'p'. When 'p' is
+    its own reverse complement the forward result is reused instead of scanning again.
+
+    Parameters:
+    - search (function): search(q) runs the matcher for pattern q. It returns the offsets,
+                         or a tuple whose first element is the offsets and whose other
+                         elements are counts or lists (e.g. index hits).
+    - p (str): The pattern.
+    - strand (str): '+' (forward), '-' (reverse complement) or 'both'.
+
+    Returns:
+    - list or tuple: The sorted (offset, strand) hits. If 'search' returns a tuple, a tuple
+                     is returned with the tagged hits first and the other elements added
+                     up across the strands that were actually searched.
+    """
+
+    if strand not in STRANDS:
+        raise ValueError('strand must be one of %s' % ', '.join(STRANDS))
+
+    results = []  # (strand, search result)
+    if strand in ('+', 'both'):
+        results.append(('+', search(p)))
+    if strand in ('-', 'both'):
+        p_rc = reverseComplement(p)
+        if strand == 'both' and p_rc == p:
+            results.append(('-', None))  # palindrome: same hits as the forward strand
+        else:
+            results.append(('-', search(p_rc)))
+
+    hits = []
+    extras = None
+    for tag, result in results:
+        if result is None:
+            result = results[0][1]
+        elif isinstance(result, tuple):
+            extras = list(result[1:]) if extras is None else [a + b for a, b in zip(extras, result[1:])]
+        offsets = result[0] if isinstance(result, tuple) else result
+        hits.extend((offset, tag) for offset in offsets)
+    hits.sort()
+    if extras is None:
+        return hits
+    return (hits,) + tuple(extras)
+
+
+def iter_strands(search, p, strand='both'):
+    """
+    Lazy counterpart of search_strands: yield strand-tagged hits as the matcher finds them.
+
+    Parameters:
+    - search (function): search(q) returns an iterator over the offsets of pattern q
+                         (e.g. alignment_naive_matching.iter_naive_matching).
+    - p (str): The pattern.
+    - strand (str): '+' (forward), '-' (reverse complement) or 'both'.
+
+    Returns:
+    - generator: Yields (offset, strand) tuples, forward strand first. A palindromic
+                 pattern is scanned once and each of its hits is yielded for both strands.
+    """
+
+    if strand not in STRANDS:
+        raise ValueError('strand must be one of %s' % ', '.join(STRANDS))
+
+    p_rc = reverseComplement(p) if strand != '+' else None
+    if strand == 'both' and p_rc == p:
+        for offset in search(p):
+            yield offset, '+'
+            yield offset, '-'
+        return
+    if strand in ('+', 'both'):
+        for offset in search(p):
+            yield offset, '+'
+    if strand in ('-', 'both'):
+        for offset in search(p_rc):
+            yield offset, '-'
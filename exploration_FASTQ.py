@@ -18,7 +18,8 @@ def qualityScore_hist(qualityStrings):
     Create a histogram of quality scores from a list of quality strings.
 
     Args:
-    qualityStrings (list): A list of quality strings, where each string represents quality scores of bases in a read.
+    qualityStrings (iterable): Quality strings, where each string represents quality scores of bases in a read,
+        or FASTQRecord objects such as those yielded by readFASTQ.parseFASTQ.
 
     Returns:
     list: A histogram of quality scores, where the index represents the quality score and the value represents the frequency.
@@ -28,6 +29,8 @@ def qualityScore_hist(qualityStrings):
     
     # Iterate through each read in the list of quality strings
     for read in qualityStrings:
+        if not isinstance(read, str):
+            read = read.qual  # FASTQRecord from the streaming reader
         # Iterate through each Phred quality score in the current read
         for phred in read:
             # Convert the Phred quality score to a numeric quality score
@@ -43,7 +46,7 @@ def findGCbyPosition(reads):
     Calculates the GC ratio at each position in a collection of DNA sequences.
 
     Parameters:
-    - reads (list of str): A list containing DNA sequences as strings.
+    - reads (iterable): DNA sequences as strings, or FASTQRecord objects such as those yielded by readFASTQ.parseFASTQ.
 
     Returns:
     - list: A list representing the GC ratio at each position in the sequences.
@@ -52,6 +55,8 @@ def findGCbyPosition(reads):
     gc = [0] * 100 #Initialized list for GC counts at each positionin the DNA sequences
     totals = [0] * 100 #Initialized list for total counts at each position
     for read in reads:
+        if not isinstance(read, str):
+            read = read.seq  # FASTQRecord from the streaming reader
         for i in range(len(read)):
             if read[i] == 'C' or read[i] == 'G':
                 gc[i] += 1
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+
+"""fmIndex.py: Suffix array construction and an FM-index for exact matching."""
+
+from array import array
+
+from kmerEncoding import OFFSET_TYPECODE
+
+SENTINEL = '$'
+
+
+def suffix_array(t):
+    """
+    Build the suffix array of t + '$' using the SA-IS algorithm (Nong, Zhang & Chan 2009).
+
+    Parameters:
+    - t (str): The text; it must not contain '$'.
+
+    Returns:
+    - list: The starting offsets of the suffixes of t + '$' in lexicographic order
+            (the first entry is always len(t), the sentinel suffix).
+    """
+
+    alphabet = sorted(set(t))
+    rank = {c: i + 1 for i, c in enumerate(alphabet)}  # 0 is reserved for the sentinel
+    return _sais([rank[c] for c in t] + [0], len(alphabet) + 1)
+
+
+def _sais(s, K):
+    """ SA-IS over integer string s (values < K) whose last symbol is a unique 0 """
+    n = len(s)
+    if n == 1:
+        return [0]
+
+    # Classify suffixes: S-type (True) or L-type (False)
+    stype = [False] * n
+    stype[-1] = True
+    for i in range(n - 2, -1, -1):
+        stype[i] = s[i] < s[i+1] or (s[i] == s[i+1] and stype[i+1])
+    lms = [i for i in range(1, n) if stype[i] and not stype[i-1]]  # leftmost S positions
+    is_lms = [False] * n
+    for i in lms:
+        is_lms[i] = True
+
+    counts = [0] * K
+    for c in s:
+        counts[c] += 1
+
+    def induce(sorted_lms):
+        """ Induce the order of all suffixes from LMS suffixes given in sorted order """
+        sa = [-1] * n
+        tails, total = [0] * K, 0
+        for c in range(K):
+            total += counts[c]
+            tails[c] = total - 1
+        for i in reversed(sorted_lms):  # LMS suffixes go to the ends of their buckets
+            sa[tails[s[i]]] = i
+            tails[s[i]] -= 1
+        heads, total = [0] * K, 0
+        for c in range(K):
+            heads[c] = total
+            total += counts[c]
+        for i in range(n):  # L-type suffixes, left to right
+            j = sa[i] - 1
+            if j >= 0 and not stype[j]:
+                sa[heads[s[j]]] = j
+                heads[s[j]] += 1
+        total = 0
+        for c in range(K):
+            total += counts[c]
+            tails[c] = total - 1
+        for i in range(n - 1, -1, -1):  # S-type suffixes, right to left
+            j = sa[i] - 1
+            if j >= 0 and stype[j]:
+                sa[tails[s[j]]] = j
+                tails[s[j]] -= 1
+        return sa
+
+    # Sort LMS substrings by one induction pass, then name them
+    sa = induce(lms)
+    names = [-1] * n
+    name = -1
+    prev = -1
+    for i in sa:
+        if not is_lms[i]:
+            continue
+        if prev < 0 or not _lms_equal(s, stype, is_lms, prev, i):
+            name += 1
+        names[i] = name
+        prev = i
+
+    reduced = [names[i] for i in lms]
+    if name + 1 < len(lms):  # names not unique yet: recurse on the reduced string
+        reduced_sa = _sais(reduced, name + 1)
+    else:
+        reduced_sa = [0] * len(lms)
+        for i, c in enumerate(reduced):
+            reduced_sa[c] = i
+    return induce([lms[i] for i in reduced_sa])
+
+
+def _lms_equal(s, stype, is_lms, a, b):
+    """ True if the LMS substrings starting at a and b are identical """
+    n = len(s)
+    k = 0
+    while True:
+        if a + k >= n or b + k >= n:
+            return False
+        if s[a+k] != s[b+k] or stype[a+k] != stype[b+k]:
+            return False
+        if k > 0 and (is_lms[a+k] or is_lms[b+k]):
+            return is_lms[a+k] and is_lms[b+k]
+        k += 1
+
+
+class FMIndex(object):
+    """ Holds an FM-index (BWT, occurrence checkpoints and a sampled
+        suffix array) for a text T.  A single index answers exact queries
+        for patterns of any length. """
+
+    def __init__(self, t, sa_sample=32, occ_sample=64):
+        """ Create FM-index of t, keeping every sa_sample-th text offset
+            and an occurrence count every occ_sample BWT rows """
+        if SENTINEL in t:
+            raise ValueError("text must not contain '%s'" % SENTINEL)
+        t = t[:]  # materialise str-like reference views
+        sa = suffix_array(t)
+        self.n = len(sa)  # rows, including the sentinel suffix
+        self.sa_sample = sa_sample
+        self.occ_sample = occ_sample
+        self.bwt = ''.join([t[i-1] if i > 0 else SENTINEL for i in sa])
+
+        # C[c]: number of characters in T$ that sort before c
+        self.C = {}
+        total = 1  # the sentinel
+        for c in sorted(set(t)):
+            self.C[c] = total
+            total += t.count(c)
+
+        # occ[c][b]: occurrences of c in bwt[:b * occ_sample]
+        self.occ = {}
+        for c in self.C:
+            checkpoints = array(OFFSET_TYPECODE, [0]) * (self.n // occ_sample + 1)
+            for b in range(1, len(checkpoints)):
+                checkpoints[b] = checkpoints[b-1] + self.bwt.count(c, (b-1) * occ_sample, b * occ_sample)
+            self.occ[c] = checkpoints
+
+        # Rows whose suffix offset is a multiple of sa_sample keep that offset
+        self.marked = bytearray(self.n)
+        self.samples = array(OFFSET_TYPECODE)
+        for row, offset in enumerate(sa):
+            if offset % sa_sample == 0:
+                self.marked[row] = 1
+                self.samples.append(offset)
+        self.marked_checkpoints = array(OFFSET_TYPECODE, [0]) * (self.n // occ_sample + 1)
+        for b in range(1, len(self.marked_checkpoints)):
+            self.marked_checkpoints[b] = (self.marked_checkpoints[b-1]
+                                          + self.marked.count(1, (b-1) * occ_sample, b * occ_sample))
+
+    def _rank(self, c, row):
+        """ Number of occurrences of c in bwt[:row] """
+        b = row // self.occ_sample
+        return self.occ[c][b] + self.bwt.count(c, b * self.occ_sample, row)
+
+    def range(self, p):
+        """ Return the half-open range of BWT rows whose suffixes start with p """
+        lo, hi = 0, self.n
+        for c in reversed(p):
+            if c not in self.C:
+                return 0, 0
+            lo = self.C[c] + self._rank(c, lo)
+            hi = self.C[c] + self._rank(c, hi)
+            if lo >= hi:
+                return 0, 0
+        return lo, hi
+
+    def count(self, p):
+        """ Return the number of occurrences of p in T """
+        lo, hi = self.range(p)
+        return hi - lo
+
+    def _resolve(self, row):
+        """ Text offset of the suffix in a BWT row, walking LF to a sampled row """
+        steps = 0
+        while not self.marked[row]:
+            c = self.bwt[row]
+            row = self.C[c] + self._rank(c, row)
+            steps += 1
+        b = row // self.occ_sample
+        sample = self.marked_checkpoints[b] + self.marked.count(1, b * self.occ_sample, row)
+        return self.samples[sample] + steps
+
+    def locate(self, p):
+        """ Return the sorted offsets of all occurrences of p in T """
+        lo, hi = self.range(p)
+        return sorted(self._resolve(row) for row in range(lo, hi))
+
+    def seed_index(self, k):
+        """ Return a view of this index answering first-k-mer queries, usable
+            wherever an Index(t, k) is expected (e.g. queryIndex_exactMatching) """
+        return FMSeedIndex(self, k)
+
+    def nbytes(self):
+        """ Return the approximate number of bytes held by the index structures """
+        return (len(self.bwt) + len(self.marked)
+                + sum(len(a) * a.itemsize for a in self.occ.values())
+                + len(self.samples) * self.samples.itemsize
+                + len(self.marked_checkpoints) * self.marked_checkpoints.itemsize)
+
+
+class FMSeedIndex(object):
+    """ Fixed seed length view of an FMIndex with the Index query API """
+
+    def __init__(self, fm_index, k):
+        self.fm_index = fm_index
+        self.k = k  # seed length
+
+    def count(self, p):
+        """ Return the number of index hits for first k-mer of p (no locate work) """
+        kmer = p[:self.k]
+        if len(kmer) < self.k:
+            return 0
+        return self.fm_index.count(kmer)
+
+    def query(self, p, max_hits=None):
+        """ Return index hits for first k-mer of p; none if there are more than max_hits """
+        kmer = p[:self.k]
+        if len(kmer) < self.k:
+            return []
+        if max_hits is not None and self.fm_index.count(kmer) > max_hits:
+            return []  # over-represented k-mer: skip it before resolving any offset
+        return self.fm_index.locate(kmer)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Versioned binary file format for the k-mer and subsequence indexes.
+# Layout: a fixed little-endian header followed by up to two unsigned 32-bit
+# arrays (little-endian), so a saved index can be memory-mapped and queried
+# straight from the page cache instead of being rebuilt and re-sorted.
+#
+#   magic, version, kind, k, ival, bucket_len, reference crc32,
+#   reference length, length of array 0, length of array 1
+
+import struct
+import sys
+import zlib
+from array import array
+
+from kmerEncoding import OFFSET_TYPECODE
+from packedGenome import map_file
+
+MAGIC = b'DNAIDX\x00\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sH8sIIIIQQQ')
+HEADER_SIZE = (HEADER.size + 7) // 8 * 8  # arrays start 8-byte aligned
+CHECKSUM_CHUNK = 1 << 20
+
+
+def reference_checksum(t):
+    """
+    Compute the CRC-32 of a reference text.
+
+    Parameters:
+    - t (str): The text (a str or a str-like reference view).
+
+    Returns:
+    - int: The CRC-32 of the ASCII bytes of 't'.
+    """
+
+    crc = 0
+    for start in range(0, len(t), CHECKSUM_CHUNK):
+        crc = zlib.crc32(t[start:start + CHECKSUM_CHUNK].encode('ascii'), crc)
+    return crc
+
+
+def write_index(path, kind, t, k, ival, arrays, bucket_len=0):
+    """
+    Write index arrays to 'path' with a header describing the index and its reference.
+
+    Parameters:
+    - path (str): The file to write.
+    - kind (str): The index type, e.g. 'kmer' or 'subseq' (at most 8 characters).
+    - t (str): The reference text the index was built from.
+    - k (int): The number of characters per indexed key.
+    - ival (int): The spacing between key characters (1 for contiguous k-mers).
+    - arrays (list): One or two sequences of unsigned 32-bit integers.
+    - bucket_len (int): Index-specific layout parameter, stored as-is.
+    """
+
+    if len(kind) > 8:
+        raise ValueError('index kind %r is longer than 8 characters' % kind)
+    arrays = [array(OFFSET_TYPECODE, a) for a in arrays]
+    lengths = [len(a) for a in arrays] + [0] * (2 - len(arrays))
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, kind.encode('ascii'), k, ival, bucket_len,
+                         reference_checksum(t), len(t), lengths[0], lengths[1])
+    with open(path, 'wb') as fh:
+        fh.write(header.ljust(HEADER_SIZE, b'\x00'))
+        for a in arrays:
+            if sys.byteorder == 'big':
+                a.byteswap()
+            a.tofile(fh)
+
+
+def index_kind(path):
+    """ Return the kind ('kmer', 'subseq', 'hashed', ...) of the index saved in path """
+    with open(path, 'rb') as fh:
+        header = fh.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError('%s: not an index file' % path)
+    return HEADER.unpack(header)[2].rstrip(b'\x00').decode('ascii')
+
+
+def read_index(path, kind, t, verify=True):
+    """
+    Memory-map an index written by write_index.
+
+    Parameters:
+    - path (str): The file to read.
+    - kind (str): The expected index type.
+    - t (str): The reference text the index will be queried against.
+    - verify (bool): If True, check the CRC-32 of 't' against the header (one pass over 't').
+
+    Returns:
+    - tuple: A tuple containing two elements:
+        - dict: The header fields 'k', 'ival' and 'bucket_len'.
+        - list: The stored arrays, as read-only memoryviews over the mapped file
+                (copied into arrays on big-endian hosts).
+
+    Raises:
+    - ValueError: If the file is not a supported index of the expected kind, or was built from a different reference.
+    """
+
+    buf = map_file(path)
+    if len(buf) < HEADER_SIZE:
+        raise ValueError('%s: not an index file' % path)
+    (magic, version, file_kind, k, ival, bucket_len,
+     checksum, text_length, length0, length1) = HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError('%s: not an index file' % path)
+    if version != FORMAT_VERSION:
+        raise ValueError('%s: unsupported index format version %d' % (path, version))
+    if file_kind.rstrip(b'\x00').decode('ascii') != kind:
+        raise ValueError('%s: expected a %s index' % (path, kind))
+    if text_length != len(t) or (verify and checksum != reference_checksum(t)):
+        raise ValueError('%s: index was built from a different reference' % path)
+
+    arrays = []
+    start = HEADER_SIZE
+    itemsize = array(OFFSET_TYPECODE).itemsize
+    for length in (length0, length1):
+        view = memoryview(buf)[start:start + length * itemsize].cast(OFFSET_TYPECODE)
+        if sys.byteorder == 'big':
+            view = array(OFFSET_TYPECODE, view)
+            view.byteswap()
+        arrays.append(view)
+        start += length * itemsize
+    return {'k': k, 'ival': ival, 'bucket_len': bucket_len}, arrays
+
+
+class SortedKeyView(object):
+    """ Read-only sequence of (key, offset) pairs rebuilt on demand from sorted offsets.
+
+        Stands in for the sorted list of tuples held by Index and SubseqIndex,
+        so bisect and the existing query loops work on a loaded index. """
+
+    def __init__(self, t, offsets, span, ival=1):
+        self.t = t
+        self.offsets = offsets
+        self.span = span  # characters of t covered by each key
+        self.ival = ival
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        offset = self.offsets[i]
+        return self.t[offset:offset + self.span:self.ival], offset
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+# 2-bit encoding of DNA k-mers as integers (A=0, C=1, G=2, T=3, first base in
+# the high bits). Codes sort in the same order as the k-mer strings.
+
+from array import array
+
+ENCODE = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+DECODE = 'ACGT'
+CHUNK_SIZE = 1 << 16  # characters pulled from the text per slice
+
+# unsigned 32-bit typecode for offset buffers ('I' is 32-bit on all mainstream platforms)
+OFFSET_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def encode_kmer(kmer):
+    """
+    Encode a DNA string as an integer.
+
+    Parameters:
+    - kmer (str): A string over A, C, G and T.
+
+    Returns:
+    - int: The 2-bit code of 'kmer', or None if it contains any other character.
+    """
+
+    code = 0
+    for c in kmer:
+        b = ENCODE.get(c)
+        if b is None:
+            return None
+        code = (code << 2) | b
+    return code
+
+
+def decode_kmer(code, k):
+    """ Return the k-mer string whose 2-bit code is 'code' """
+    return ''.join([DECODE[(code >> (2 * (k - 1 - i))) & 3] for i in range(k)])
+
+
+def iter_bases(t, chunk_size=CHUNK_SIZE):
+    """ Yield the characters of t, slicing it in chunks so str-like reference views stay fast """
+    for start in range(0, len(t), chunk_size):
+        for c in t[start:start + chunk_size]:
+            yield c
+
+
+def iter_kmer_codes(t, k):
+    """
+    Yield the 2-bit code of every k-mer of t made only of A, C, G and T.
+
+    Parameters:
+    - t (str): The text (a str or a str-like reference view).
+    - k (int): The k-mer length.
+
+    Returns:
+    - generator: Yields (offset, code) pairs in increasing offset order.
+    """
+
+    mask = (1 << (2 * k)) - 1
+    code = 0
+    run = 0  # number of consecutive ACGT characters ending at the current position
+    for x, c in enumerate(iter_bases(t)):
+        b = ENCODE.get(c)
+        if b is None:
+            run = 0
+            code = 0
+            continue
+        code = ((code << 2) | b) & mask
+        run += 1
+        if run >= k:
+            yield x - k + 1, code
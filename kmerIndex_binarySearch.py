@@ -5,6 +5,10 @@
 __author__ = "Ben Langmead"
 
 import bisect
+import sys
+
+from indexIO import SortedKeyView, read_index, write_index
+from seedOccurrence import occurrence_stats
 
 
 class Index(object):
@@ -17,10 +21,26 @@ class Index(object):
         for i in range(len(t) - k + 1):  # for each k-mer
             self.index.append((t[i:i+k], i))  # add (k-mer, offset) pair
         self.index.sort()  # alphabetize by k-mer
+        self._occ_stats = None
+        self.occurrence_stats()  # summarized at build time; a loaded index computes it on first use
+
+    def occurrence_stats(self):
+        """ Return how often the k-mers of the index occur (see seedOccurrence) """
+        if self._occ_stats is None:
+            self._occ_stats = occurrence_stats(self.index[i][0] for i in range(len(self.index)))
+        return self._occ_stats
+
+    def count(self, p):
+        """ Return the number of index hits for first k-mer of p, without collecting them """
+        kmer = p[:self.k]
+        return (bisect.bisect_left(self.index, (kmer, sys.maxsize))
+                - bisect.bisect_left(self.index, (kmer, -1)))
 
-    def query(self, p):
-        """ Return index hits for first k-mer of p """
+    def query(self, p, max_hits=None):
+        """ Return index hits for first k-mer of p; none if there are more than max_hits """
         kmer = p[:self.k]  # query with first k-mer
+        if max_hits is not None and self.count(kmer) > max_hits:
+            return []  # over-represented k-mer (e.g. a repeat): skip it
         i = bisect.bisect_left(self.index, (kmer, -1))  # binary search
         hits = []
         while i < len(self.index):  # collect matching index entries
@@ -29,3 +49,17 @@ class Index(object):
             hits.append(self.index[i][1])
             i += 1
         return hits
+
+    def save(self, path, t):
+        """ Write the index for text t to path (see indexIO) """
+        write_index(path, 'kmer', t, self.k, 1, [[offset for _, offset in self.index]])
+
+    @classmethod
+    def load(cls, path, t, verify=True):
+        """ Memory-map an index saved for text t instead of rebuilding it """
+        header, (offsets, _) = read_index(path, 'kmer', t, verify)
+        index = cls.__new__(cls)
+        index.k = header['k']
+        index.index = SortedKeyView(t, offsets, index.k)
+        index._occ_stats = None
+        return index
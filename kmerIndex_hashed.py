@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+"""kmerIndex_hashed.py: A compact, array-backed k-mer index for indexing a text."""
+
+import bisect
+from array import array
+
+from indexIO import read_index, write_index
+from kmerEncoding import OFFSET_TYPECODE, encode_kmer, iter_kmer_codes
+from seedOccurrence import occurrence_stats
+
+
+def default_bucket_len(k, n):
+    """ Largest bucket prefix (at most k) whose table costs at most 2 bytes per indexed position """
+    bucket_len = 0
+    while bucket_len < k and 4 ** (bucket_len + 1) <= max(n // 2, 1):
+        bucket_len += 1
+    return bucket_len
+
+
+class HashedIndex(object):
+    """ Holds a k-mer index for a text T as flat offset arrays.
+
+        Offsets are laid out by counting sort on the 2-bit code of each
+        k-mer's first 'bucket_len' bases, so a query finds its bucket with
+        one table lookup.  When bucket_len < k the bucket is kept sorted by
+        k-mer and narrowed with a binary search against T.  K-mers holding
+        characters other than A, C, G and T are not indexed. """
+
+    def __init__(self, t, k, bucket_len=None):
+        """ Create index from all substrings of t of length k """
+        self.k = k  # k-mer length (k)
+        self.t = t  # kept to resolve k-mers longer than the bucket prefix
+        if bucket_len is None:
+            bucket_len = default_bucket_len(k, len(t))
+        self.bucket_len = bucket_len
+        self.shift = 2 * (k - bucket_len)  # drops the bits below the bucket prefix
+
+        # Counting sort: count k-mers per bucket, then turn counts into start offsets
+        self.bucket_starts = array(OFFSET_TYPECODE, [0]) * (4 ** bucket_len + 1)
+        for _, code in self._indexed_kmers(t):
+            self.bucket_starts[(code >> self.shift) + 1] += 1
+        for b in range(1, len(self.bucket_starts)):
+            self.bucket_starts[b] += self.bucket_starts[b-1]
+
+        self.offsets = array(OFFSET_TYPECODE, [0]) * self.bucket_starts[-1]
+        fill = array(OFFSET_TYPECODE, self.bucket_starts)  # next free slot per bucket
+        for i, code in self._indexed_kmers(t):
+            b = code >> self.shift
+            self.offsets[fill[b]] = i
+            fill[b] += 1
+
+        if bucket_len < k:  # order each bucket by the rest of the k-mer (stable, so offsets stay ascending)
+            for b in range(len(self.bucket_starts) - 1):
+                lo, hi = self.bucket_starts[b], self.bucket_starts[b+1]
+                if hi - lo > 1:
+                    self.offsets[lo:hi] = array(OFFSET_TYPECODE, sorted(self.offsets[lo:hi], key=self._suffix))
+        self._occ_stats = None
+        self.occurrence_stats()  # summarized at build time; a loaded index computes it on first use
+
+    def _indexed_kmers(self, t):
+        """ (offset, code) of every k-mer of t to index, in increasing offset order """
+        return iter_kmer_codes(t, self.k)
+
+    def _suffix(self, offset):
+        """ The part of the k-mer at 'offset' that is not covered by its bucket """
+        return self.t[offset + self.bucket_len:offset + self.k]
+
+    def _range(self, p):
+        """ The slice of offsets holding the first k-mer of p """
+        kmer = p[:self.k]  # query with first k-mer
+        code = encode_kmer(kmer) if len(kmer) == self.k else None
+        if code is None:
+            return 0, 0
+        b = code >> self.shift
+        lo, hi = self.bucket_starts[b], self.bucket_starts[b+1]
+        if self.bucket_len < self.k and lo < hi:
+            rest = kmer[self.bucket_len:]
+            lo = bisect.bisect_left(self.offsets, rest, lo, hi, key=self._suffix)
+            hi = bisect.bisect_right(self.offsets, rest, lo, hi, key=self._suffix)
+        return lo, hi
+
+    def count(self, p):
+        """ Return the number of index hits for first k-mer of p, without collecting them """
+        lo, hi = self._range(p)
+        return hi - lo
+
+    def query(self, p, max_hits=None):
+        """ Return index hits for first k-mer of p; none if there are more than max_hits """
+        lo, hi = self._range(p)
+        if max_hits is not None and hi - lo > max_hits:
+            return self.offsets[0:0]  # over-represented k-mer (e.g. a repeat): skip it
+        return self.offsets[lo:hi]  # array slice: no per-hit objects
+
+    def occurrence_stats(self):
+        """ Return how often the k-mers of the index occur (see seedOccurrence) """
+        if self._occ_stats is None:
+            self._occ_stats = occurrence_stats(self.t[i:i + self.k] for i in self.offsets)
+        return self._occ_stats
+
+    def nbytes(self):
+        """ Return the number of bytes held by the offset and bucket arrays """
+        return (len(self.offsets) * self.offsets.itemsize
+                + len(self.bucket_starts) * self.bucket_starts.itemsize)
+
+    def save(self, path):
+        """ Write the index to path (see indexIO) """
+        write_index(path, 'hashed', self.t, self.k, 1, [self.offsets, self.bucket_starts], self.bucket_len)
+
+    @classmethod
+    def load(cls, path, t, verify=True):
+        """ Memory-map an index saved for text t instead of rebuilding it """
+        header, arrays = read_index(path, 'hashed', t, verify)
+        return cls._from_arrays(t, header, *arrays)
+
+    @classmethod
+    def _from_arrays(cls, t, header, offsets, bucket_starts):
+        """ Rebuild an index around arrays read by indexIO.read_index """
+        index = cls.__new__(cls)
+        index.k = header['k']
+        index.t = t
+        index.bucket_len = header['bucket_len']
+        index.shift = 2 * (index.k - index.bucket_len)
+        index.offsets = offsets
+        index.bucket_starts = bucket_starts
+        index._occ_stats = None
+        return index
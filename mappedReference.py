@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+
+# Memory-mapped reference genomes.
+# The views returned here behave like a read-only str (len, character access,
+# slicing), so they can be passed as 't' to the matchers and index builders.
+# The genome stays in the page cache instead of each process's heap, and
+# every process that opens the same file shares one physical copy.
+
+import os
+
+from packedGenome import (INDEX_SUFFIX, PACK_SUFFIX, PackedSequence, cache_paths,
+                          map_file, read_genome_index, write_genome_index)
+from readFASTA import loadFASTA
+
+PLAIN_SUFFIX = '.seq'
+PLAIN_INDEX_SUFFIX = '.seq.idx'
+
+
+class MappedSequence(object):
+    """ Read-only, str-like view of one contig inside an uncompressed, memory-mapped genome file """
+
+    def __init__(self, buf, offset, length):
+        self.buf = buf  # one byte per base (usually an mmap shared by every contig)
+        self.offset = offset  # offset of the contig's first base in buf
+        self.length = length
+        self.source = None  # (callable, args) that reopens this view
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step < 0:
+                return ''.join([self[i] for i in range(start, stop, step)])
+            if start >= stop:
+                return ''
+            return self.buf[self.offset+start:self.offset+stop:step].decode('ascii')
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError('mapped sequence index out of range')
+        return chr(self.buf[self.offset + key])
+
+    def find(self, sub, start=0, end=None):
+        """ Return the lowest offset where sub is found within [start, end), or -1 """
+        start, end, _ = slice(start, end).indices(self.length)
+        i = self.buf.find(sub.encode('ascii'), self.offset + start, self.offset + end)
+        return -1 if i == -1 else i - self.offset
+
+    def __str__(self):
+        return self[:]
+
+    def __reduce__(self):
+        # Pickle by reference to the file so worker processes map the same pages
+        if self.source is None:
+            raise TypeError('cannot pickle a MappedSequence that was not opened by mappedReference')
+        return self.source
+
+    def __repr__(self):
+        return 'MappedSequence(offset=%d, length=%d)' % (self.offset, self.length)
+
+
+def write_plain_reference(contigs, seq_path, index_path):
+    """
+    Write contigs to an uncompressed file (one byte per base) plus an offsets sidecar.
+
+    Parameters:
+    - contigs (dict): A mapping of contig name to DNA string.
+    - seq_path (str): Path of the bases file to write.
+    - index_path (str): Path of the sidecar file to write.
+    """
+
+    write_genome_index(contigs, index_path, 'plainGenome', n_blocks=False)
+    with open(seq_path, 'wb') as fh:
+        for seq in contigs.values():
+            fh.write(seq.encode('ascii'))
+
+
+def open_reference_contigs(path):
+    """
+    Memory-map every contig of a reference.
+
+    Parameters:
+    - path (str): A packed genome ('.pack'), an uncompressed genome ('.seq'), or a FASTA
+                  file. For a FASTA file the packed cache next to it is used, and written
+                  first if it is missing or stale (see readFASTA.loadFASTA).
+
+    Returns:
+    - dict: A mapping of contig name to PackedSequence or MappedSequence, in file order.
+    """
+
+    return _open(path, None)
+
+
+def open_reference(path, contig=None):
+    """
+    Memory-map a reference as a single str-like sequence.
+
+    Parameters:
+    - path (str): A packed genome ('.pack'), an uncompressed genome ('.seq'), or a FASTA file
+                  (see open_reference_contigs).
+    - contig (str): The contig to open. If None, all contigs are viewed as one concatenated
+                    sequence, as returned by readFASTA.readFASTA.
+
+    Returns:
+    - PackedSequence or MappedSequence: A view that supports len(), indexing and slicing,
+      and that pickles by path so it can be sent to worker processes cheaply.
+    """
+
+    return _open(path, contig if contig is not None else True)
+
+
+def _open(path, contig):
+    """ Open the contigs of path; contig is None (all), True (concatenation) or a name """
+    if path.endswith(PACK_SUFFIX):
+        packed, index_path = True, path[:-len(PACK_SUFFIX)] + INDEX_SUFFIX
+    elif path.endswith(PLAIN_SUFFIX):
+        packed, index_path = False, path[:-len(PLAIN_SUFFIX)] + PLAIN_INDEX_SUFFIX
+    else:
+        pack_path, _ = cache_paths(path)
+        plain_path = path + PLAIN_SUFFIX
+        if os.path.exists(plain_path) and not os.path.exists(pack_path):
+            return _open(plain_path, contig)
+        loadFASTA(path, cache=True)  # writes the packed cache if it is missing or stale
+        return _open(pack_path, contig)
+
+    layout, n_blocks = read_genome_index(index_path, 'packedGenome' if packed else 'plainGenome')
+    buf = map_file(path)
+
+    def view(name, offset, length, blocks):
+        if packed:
+            seq = PackedSequence(buf, offset, length, blocks)
+        else:
+            seq = MappedSequence(buf, offset, length)
+        seq.source = (open_reference, (path, name))
+        return seq
+
+    if contig is None:
+        return {name: view(name, offset, length, n_blocks[name])
+                for name, (offset, length) in layout.items()}
+    if contig is True:
+        total = sum(length for _, length in layout.values())
+        blocks = [(offset + start, run)
+                  for name, (offset, _) in layout.items() for start, run in n_blocks[name]]
+        return view(None, 0, total, blocks)
+    if contig not in layout:
+        raise KeyError('%s: no contig named %r' % (path, contig))
+    offset, length = layout[contig]
+    return view(contig, offset, length, n_blocks[contig])
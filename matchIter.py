@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+# Early termination for the lazy matchers (the iter_* functions).
+# They yield offsets as they are found, so a caller that only needs the
+# first hit, or the first few, stops the scan there instead of enumerating
+# every copy of a repeat.
+
+import itertools
+
+
+def first_hit(hits, default=None):
+    """ Return the first hit of a lazy matcher, or 'default' if there is none """
+    return next(iter(hits), default)
+
+
+def take_hits(hits, n):
+    """ Return a list of at most the first n hits of a lazy matcher """
+    return list(itertools.islice(hits, n))
+
+
+def has_hit(hits):
+    """ Return True if a lazy matcher finds at least one hit (the scan stops at the first) """
+    for _ in hits:
+        return True
+    return False
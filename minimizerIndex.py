@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+"""minimizerIndex.py: A sparse k-mer index holding only the (w, k)-minimizers of a text."""
+
+import random
+import unittest
+from collections import deque
+
+from alignment_queryIndex_approximate_matching import queryIndex_approximate_matching
+from indexIO import read_index, write_index
+from kmerEncoding import decode_kmer, iter_kmer_codes
+from kmerIndex_hashed import HashedIndex, default_bucket_len
+
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # odd, so every multiply round is invertible
+HASH_MULTIPLIER_2 = 0xBF58476D1CE4E5B9
+
+
+def kmer_hash(code, k, mask):
+    """ Invertible mix of a 2-bit k-mer code within its 2k bits ('mask'): distinct k-mers never
+        collide, every hash bit depends on every base, and poly-A (code 0) gets no special hash """
+    code = (~code + (code << 21)) & mask  # odd multiplier minus one: 0 no longer maps to 0
+    code ^= code >> k  # fold the high half (the first bases) into the low half
+    code = (code * HASH_MULTIPLIER) & mask
+    code ^= code >> k
+    code = (code * HASH_MULTIPLIER_2) & mask
+    return code ^ (code >> k)
+
+
+def iter_minimizers(t, k, w):
+    """
+    Yield the (w, k)-minimizers of a text.
+
+    For every window of w consecutive k-mers, the minimizer is the k-mer with the
+    smallest hash. Hashing the codes instead of comparing them directly keeps
+    low-complexity k-mers such as poly-A from being picked everywhere. Ties (a
+    repeated k-mer, such as in a homopolymer run) are broken by robust winnowing:
+    the previous minimizer is kept while it is still in the window, otherwise the
+    rightmost tied k-mer is picked, so a run yields one minimizer per w positions
+    instead of one per position. Consecutive windows mostly share their minimizer,
+    so about 2 / (w + 1) of the positions are kept.
+
+    Parameters:
+    - t (str): The text (a str or a str-like reference view).
+    - k (int): The k-mer length.
+    - w (int): The number of consecutive k-mers per window.
+
+    Returns:
+    - generator: Yields (offset, code) pairs for each distinct minimizer, in increasing
+                 offset order. Stretches with fewer than w consecutive ACGT k-mers yield nothing.
+    """
+
+    mask = (1 << (2 * k)) - 1
+    window = deque()  # (hash, offset, code) with increasing hashes: the front is the minimum
+    run = 0  # consecutive k-mers ending at the current one
+    last = -1  # offset of the last minimizer yielded
+    last_hash = None
+    prev = -2
+    for i, code in iter_kmer_codes(t, k):
+        if i != prev + 1:  # a non-ACGT character broke the run of k-mers
+            window.clear()
+            run = 0
+        prev = i
+        run += 1
+        h = kmer_hash(code, k, mask)
+        while window and window[-1][0] >= h:  # on ties the front is the rightmost k-mer
+            window.pop()
+        window.append((h, i, code))
+        if window[0][1] <= i - w:
+            window.popleft()
+        if run < w or (last > i - w and last_hash == window[0][0]):
+            continue  # window not full yet, or the previous minimizer is still a minimum in it
+        last, last_hash = window[0][1], window[0][0]
+        yield last, window[0][2]
+
+
+class MinimizerIndex(HashedIndex):
+    """ Holds a (w, k)-minimizer index for a text T.
+
+        Only the minimizer of each window of w consecutive k-mers is
+        stored, in the same flat offset arrays as HashedIndex, so the
+        index is about (w + 1) / 2 times smaller than a full k-mer index.
+        A pattern is looked up through its own minimizers: any exact
+        occurrence of a pattern of at least k + w - 1 characters shares
+        a full window, and so a minimizer, with the text; shorter
+        patterns are rejected with a ValueError rather than silently
+        finding nothing. """
+
+    def __init__(self, t, k, w, bucket_len=None):
+        """ Create index from the minimizers of t """
+        self.w = w  # k-mers per window
+        if bucket_len is None:
+            bucket_len = default_bucket_len(k, 2 * len(t) // (w + 1))  # expected number of minimizers
+        HashedIndex.__init__(self, t, k, bucket_len)
+
+    def _indexed_kmers(self, t):
+        """ (offset, code) of the minimizers of t, in increasing offset order """
+        return iter_minimizers(t, self.k, self.w)
+
+    def _minimizer_codes(self, p):
+        """ The distinct minimizer codes of p, which must span at least one window """
+        if len(p) < self.k + self.w - 1:
+            raise ValueError('pattern of length %d is shorter than a window of the index (k + w - 1 = %d)'
+                             % (len(p), self.k + self.w - 1))
+        return set(code for _, code in iter_minimizers(p, self.k, self.w))
+
+    def query(self, p, max_hits=None):
+        """ Return candidate offsets of p: the text positions where a minimizer of p
+            lines up and the first k-mer of p occurs.  A minimizer with more than
+            max_hits occurrences is skipped. """
+        codes = self._minimizer_codes(p)
+        positions = {}  # k-mer code -> offsets in p
+        for j, code in iter_kmer_codes(p, self.k):
+            positions.setdefault(code, []).append(j)
+        starts = set()
+        for code in codes:
+            j = positions[code][0]
+            lo, hi = self._range(p[j:j+self.k])
+            if max_hits is not None and hi - lo > max_hits:
+                continue  # over-represented minimizer (e.g. a repeat): skip it
+            # ties may be broken at another copy of the k-mer in p than in the text: try every copy
+            for j in positions[code]:
+                starts.update(i - j for i in self.offsets[lo:hi] if i >= j)
+        kmer = p[:self.k]
+        return sorted(s for s in starts if self.t[s:s+self.k] == kmer)
+
+    def count(self, p):
+        """ Return the number of index hits for the minimizers of p, without collecting them """
+        total = 0
+        for code in self._minimizer_codes(p):
+            lo, hi = self._range(decode_kmer(code, self.k))
+            total += hi - lo
+        return total
+
+    def save(self, path):
+        """ Write the index to path (see indexIO) """
+        write_index(path, 'minimizr', self.t, self.k, self.w, [self.offsets, self.bucket_starts], self.bucket_len)
+
+    @classmethod
+    def load(cls, path, t, verify=True):
+        """ Memory-map an index saved for text t instead of rebuilding it """
+        header, arrays = read_index(path, 'minimizr', t, verify)
+        index = cls._from_arrays(t, header, *arrays)
+        index.w = header['ival']
+        return index
+
+
+class TestMinimizers(unittest.TestCase):
+
+    def test_kmer_hash_is_a_permutation(self):
+        k = 5
+        mask = (1 << (2 * k)) - 1
+        self.assertEqual(1 << (2 * k), len(set(kmer_hash(code, k, mask) for code in range(1 << (2 * k)))))
+        self.assertNotEqual(0, kmer_hash(0, k, mask))
+
+    def test_poly_a_not_over_selected(self):
+        rng = random.Random(1)
+        flank = ''.join(rng.choice('ACGT') for _ in range(10000))
+        t = flank + 'A' * 300 + ''.join(rng.choice('ACGT') for _ in range(10000))
+        k, w = 15, 10
+        minimizers = list(iter_minimizers(t, k, w))
+        poly_a = [i for i, _ in minimizers if t[i:i+k] == 'A' * k]
+        # a run of identical k-mers shares one hash: at most one minimizer per window it fills
+        self.assertLessEqual(len(poly_a), (300 - k + 1) // w + 2)
+        self.assertLess(len(poly_a), len(minimizers) // 100)
+
+    def test_short_pattern_rejected(self):
+        rng = random.Random(2)
+        t = ''.join(rng.choice('ACGT') for _ in range(5000))
+        index = MinimizerIndex(t, 12, 8)
+        p = t[1000:1048]
+        # 4 segments of 12 characters, shorter than the 19 of a window
+        self.assertRaises(ValueError, queryIndex_approximate_matching, p, t, 3, index)
+        self.assertRaises(ValueError, index.count, p[:18])
+        self.assertIn(1000, index.query(p[:19]))
+
+    def test_count_sums_minimizer_hits(self):
+        rng = random.Random(3)
+        t = ''.join(rng.choice('ACGT') for _ in range(5000))
+        index = MinimizerIndex(t, 10, 5)
+        p = t[2000:2030]
+        codes = set(code for _, code in iter_minimizers(p, 10, 5))
+        hits = sum(len([i for i, code in iter_minimizers(t, 10, 5) if code == c]) for c in codes)
+        self.assertEqual(hits, index.count(p))
+        self.assertGreaterEqual(index.count(p), len(index.query(p)))
+
+if __name__ == '__main__':
+    unittest.main()
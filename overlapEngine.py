@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+# Suffix-prefix overlaps between reads.
+# overlap() compares one pair of reads and is shared by the overlap and assembly
+# modules. iter_overlaps() finds the overlaps of all pairs at once: the reads are
+# sorted, so the reads starting with a given suffix of read a form one contiguous
+# range, found by binary search. Each suffix of a is looked up once: a dict of the
+# reads' first min_length characters gives the range of reads sharing the first
+# min_length characters of the suffix (or rules the suffix out), and a binary
+# search within that range narrows it to the reads starting with the whole
+# suffix. The work beyond that is proportional to the overlaps found. Reads are
+# referred to by their ID, i.e. their index in the input list.
+
+import bisect
+import itertools
+import random
+import unittest
+
+MAX_CHAR = chr(0x10FFFF)  # sorts after any character a read may hold
+
+
+def overlap(a, b, min_length=3):
+    """
+    Return the length of the longest suffix of string 'a' matching
+    a prefix of string 'b' that is at least 'min_length' characters long.
+    If no such overlap exists, return 0; in particular a string 'b' shorter
+    than 'min_length' never overlaps.
+
+    Parameters:
+    - a (str): First string.
+    - b (str): Second string.
+    - min_length (int): Minimum length of overlap required.
+
+    Returns:
+    - int: Length of the longest overlap between 'a' and 'b'.
+    """
+
+    if len(b) < min_length:
+        return 0  # b[:min_length] would be all of b, and shorter than required
+    start = 0  # start all the way at the left
+    while True:
+        start = a.find(b[:min_length], start)  # look for b's prefix in a
+        if start == -1:  # no more occurrences to right
+            return 0
+        # found occurrence; check for full suffix/prefix match
+        if b.startswith(a[start:]):
+            return len(a)-start
+        start += 1  # move just past previous match
+
+
+def iter_overlaps(reads, min_length=3):
+    """
+    Find the longest suffix-prefix overlap of every pair of reads.
+
+    Parameters:
+    - reads (list): A list of reads.
+    - min_length (int): Minimum length of overlap required.
+
+    Returns:
+    - generator: Yields (a, b, length) for every ordered pair of distinct read IDs
+                 where overlap(reads[a], reads[b], min_length) is not 0, grouped by
+                 increasing a. Identical reads overlap over their full length, and
+                 reads shorter than min_length neither start nor end an overlap.
+    """
+
+    order = sorted(range(len(reads)), key=reads.__getitem__)  # read IDs in sequence order
+    sorted_reads = [reads[i] for i in order]
+    buckets = {}  # first min_length characters -> range of sorted_reads starting with them
+    for j, read in enumerate(sorted_reads):
+        if len(read) >= min_length:
+            prefix = read[:min_length]
+            buckets[prefix] = (buckets.get(prefix, (j,))[0], j + 1)
+    for a, read in enumerate(reads):
+        seen = set()
+        for i in range(len(read) - min_length + 1):  # longest suffix first: the first hit of a pair is its overlap
+            bucket = buckets.get(read[i:i+min_length])
+            if bucket is None:
+                continue
+            lo, hi = bucket
+            if len(read) - i > min_length:  # narrow the bucket to the reads starting with the whole suffix
+                suffix = read[i:]
+                lo = bisect.bisect_left(sorted_reads, suffix, lo, hi)
+                hi = bisect.bisect_left(sorted_reads, suffix + MAX_CHAR, lo, hi)
+            for b in order[lo:hi]:
+                if b != a and b not in seen:
+                    seen.add(b)
+                    yield a, b, len(read) - i
+
+
+def all_overlaps(reads, min_length=3):
+    """
+    Find the longest suffix-prefix overlap of every pair of reads.
+
+    Parameters:
+    - reads (list): A list of reads.
+    - min_length (int): Minimum length of overlap required.
+
+    Returns:
+    - list: (a, b, length) tuples as yielded by iter_overlaps.
+    """
+
+    return list(iter_overlaps(reads, min_length))
+
+
+class TestOverlaps(unittest.TestCase):
+
+    def test_short_read_is_not_a_target(self):
+        self.assertEqual(0, overlap('GTCCTTAAT', 'T', 4))
+        self.assertEqual([], all_overlaps(['GTCCTTAAT', 'T'], 4))
+
+    def test_all_overlaps_match_overlap(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            reads = [''.join(rng.choice('ACG') for _ in range(rng.randint(1, 8))) for _ in range(12)]
+            expected = set()
+            for a, b in itertools.permutations(range(len(reads)), 2):
+                length = overlap(reads[a], reads[b], 3)
+                if length:
+                    expected.add((a, b, length))
+            found = all_overlaps(reads, 3)
+            self.assertEqual(len(expected), len(found))
+            self.assertEqual(expected, set(found))
+
+if __name__ == '__main__':
+    unittest.main()
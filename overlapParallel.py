@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+
+# Parallel all-pairs overlap computation.
+# b can follow a with an overlap of at least k only if the first k-mer of b
+# occurs in a, so every candidate pair is keyed by that k-mer. The k-mer table
+# is split into shards by a hash of the k-mer, and the work runs in two
+# parallel rounds, map-reduce style:
+#   1. scan: batches of reads are scanned for k-mers that start some read, and
+#      each such (read ID, offset) is routed to the shard of its k-mer;
+#   2. verify: each shard receives only its part of the first k-mer -> read IDs
+#      table, built once up front, and computes the overlaps of its candidates.
+# A pair is only ever a candidate in the shard of b's first k-mer, so no
+# overlap is computed twice. Edges come back as arrays and are streamed into an
+# OverlapGraph instead of a dict keyed by pairs of read strings.
+
+import multiprocessing
+import zlib
+from array import array
+
+from kmerEncoding import OFFSET_TYPECODE
+
+_reads = None  # per-process state set by _init_worker
+_k = None
+_first_kmers = None
+_shards = None
+
+
+class OverlapGraph(object):
+    """ Holds the overlap edges between reads as three parallel arrays:
+        source read ID, destination read ID and overlap length. """
+
+    def __init__(self, n_reads):
+        self.n_reads = n_reads
+        self.src = array(OFFSET_TYPECODE)
+        self.dst = array(OFFSET_TYPECODE)
+        self.length = array(OFFSET_TYPECODE)
+
+    def add_edges(self, src, dst, length):
+        """ Append edges given as three parallel sequences """
+        self.src.extend(src)
+        self.dst.extend(dst)
+        self.length.extend(length)
+
+    def __len__(self):
+        return len(self.src)
+
+    def edges(self):
+        """ Return an iterator over the (source, destination, length) edges """
+        return zip(self.src, self.dst, self.length)
+
+    def sort(self):
+        """ Order the edges by source, then destination read ID """
+        order = sorted(range(len(self.src)), key=lambda e: (self.src[e], self.dst[e]))
+        self.src = array(OFFSET_TYPECODE, [self.src[e] for e in order])
+        self.dst = array(OFFSET_TYPECODE, [self.dst[e] for e in order])
+        self.length = array(OFFSET_TYPECODE, [self.length[e] for e in order])
+
+    def out_degrees(self):
+        """ Return the number of edges leaving each read """
+        degrees = array(OFFSET_TYPECODE, [0]) * self.n_reads
+        for a in self.src:
+            degrees[a] += 1
+        return degrees
+
+    def nbytes(self):
+        """ Return the number of bytes held by the edge arrays """
+        return sum(len(a) * a.itemsize for a in (self.src, self.dst, self.length))
+
+
+def kmer_shard(kmer, shards):
+    """ The shard of a k-mer; a checksum rather than hash(), so shards do not change from run to run """
+    return zlib.crc32(kmer.encode('ascii')) % shards
+
+
+def scan_batch(reads, first, last, k, first_kmers, shards):
+    """
+    Route the candidate overlaps of a batch of reads to their shards.
+
+    Parameters:
+    - reads (list): All the reads.
+    - first (int): ID of the first read of the batch.
+    - last (int): ID past the last read of the batch.
+    - k (int): Minimum length of overlap required.
+    - first_kmers (dict): The first k-mers of the reads, each mapped to its shard.
+    - shards (int): The number of shards.
+
+    Returns:
+    - list: For each shard, a pair of arrays (read IDs, offsets) holding, in increasing
+            order, the positions of the batch where a k-mer of that shard starts some read.
+    """
+
+    routed = [(array(OFFSET_TYPECODE), array(OFFSET_TYPECODE)) for _ in range(shards)]
+    for a in range(first, last):
+        read = reads[a]
+        for i in range(len(read) - k + 1):
+            shard = first_kmers.get(read[i:i+k])
+            if shard is not None:
+                ids, offsets = routed[shard]
+                ids.append(a)
+                offsets.append(i)
+    return routed
+
+
+def shard_tables(reads, k, first_kmers, shards):
+    """
+    Split the first k-mer -> read IDs table by shard, in one pass over the reads.
+
+    Parameters:
+    - reads (list): All the reads.
+    - k (int): Minimum length of overlap required.
+    - first_kmers (dict): The first k-mers of the reads, each mapped to its shard.
+    - shards (int): The number of shards.
+
+    Returns:
+    - list: For each shard, a dict mapping its first k-mers to the IDs of the reads starting with them.
+    """
+
+    tables = [{} for _ in range(shards)]
+    for b, read in enumerate(reads):
+        if len(read) >= k:
+            kmer = read[:k]
+            tables[first_kmers[kmer]].setdefault(kmer, []).append(b)
+    return tables
+
+
+def verify_shard(reads, k, table, ids, offsets):
+    """
+    Compute the overlaps of the candidates routed to one shard.
+
+    Parameters:
+    - reads (list): All the reads.
+    - k (int): Minimum length of overlap required.
+    - table (dict): The shard's first k-mers, each mapped to the IDs of the reads starting with it.
+    - ids (array): Read IDs of the candidate positions, in increasing order.
+    - offsets (array): Offsets of the candidate positions, increasing within a read.
+
+    Returns:
+    - tuple: Three arrays holding the source read IDs, destination read IDs and lengths
+             of the longest overlap of every pair whose destination read's first k-mer
+             belongs to the shard.
+    """
+
+    src, dst, length = array(OFFSET_TYPECODE), array(OFFSET_TYPECODE), array(OFFSET_TYPECODE)
+    current = None
+    for a, i in zip(ids, offsets):
+        if a != current:
+            current = a
+            seen = set()  # the leftmost offset gives the longest overlap: later ones are skipped
+        read = reads[a]
+        suffix = read[i:]
+        for b in table[read[i:i+k]]:
+            if b != a and b not in seen and reads[b].startswith(suffix):
+                seen.add(b)
+                src.append(a)
+                dst.append(b)
+                length.append(len(read) - i)
+    return src, dst, length
+
+
+def _init_worker(reads, k, first_kmers, shards):
+    global _reads, _k, _first_kmers, _shards
+    _reads, _k, _first_kmers, _shards = reads, k, first_kmers, shards
+
+
+def _scan_batch(bounds):
+    return scan_batch(_reads, bounds[0], bounds[1], _k, _first_kmers, _shards)
+
+
+def _verify_shard(task):
+    table, ids, offsets = task
+    return verify_shard(_reads, _k, table, ids, offsets)
+
+
+def parallel_overlaps(reads, min_length=3, processes=None, shards=None, batch_size=1000):
+    """
+    Find the longest suffix-prefix overlap of every pair of reads, spreading the work
+    across processes (same overlaps as overlapEngine.iter_overlaps).
+
+    Parameters:
+    - reads (list): A list of reads.
+    - min_length (int): Minimum length of overlap required.
+    - processes (int): The number of worker processes; defaults to the CPU count. 1 works in this process.
+    - shards (int): The number of shards of the k-mer table; defaults to four per process.
+    - batch_size (int): The number of reads scanned by a worker at a time.
+
+    Returns:
+    - OverlapGraph: One edge per ordered pair of distinct read IDs whose overlap is not 0.
+                    Edges are grouped by shard, not sorted (see OverlapGraph.sort).
+    """
+
+    k = min_length
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if shards is None:
+        shards = 4 * processes
+    first_kmers = dict((read[:k], kmer_shard(read[:k], shards)) for read in reads if len(read) >= k)
+    batches = [(first, min(first + batch_size, len(reads))) for first in range(0, len(reads), batch_size)]
+    graph = OverlapGraph(len(reads))
+
+    if processes == 1:
+        routed = (scan_batch(reads, first, last, k, first_kmers, shards) for first, last in batches)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, initializer=_init_worker,
+                                    initargs=(reads, k, first_kmers, shards))
+        routed = pool.imap(_scan_batch, batches)  # imap keeps read order within each shard
+
+    try:
+        ids = [array(OFFSET_TYPECODE) for _ in range(shards)]
+        offsets = [array(OFFSET_TYPECODE) for _ in range(shards)]
+        for batch in routed:
+            for shard, (batch_ids, batch_offsets) in enumerate(batch):
+                ids[shard].extend(batch_ids)
+                offsets[shard].extend(batch_offsets)
+
+        tables = shard_tables(reads, k, first_kmers, shards)
+        tasks = [(tables[shard], ids[shard], offsets[shard]) for shard in range(shards) if ids[shard]]
+        if pool is None:
+            results = (verify_shard(reads, k, table, shard_ids, shard_offsets)
+                       for table, shard_ids, shard_offsets in tasks)
+        else:
+            results = pool.imap_unordered(_verify_shard, tasks)
+        for src, dst, length in results:
+            graph.add_edges(src, dst, length)
+    except BaseException:
+        if pool is not None:
+            pool.terminate()  # do not wait for the queued work before the error surfaces
+            pool.join()
+        raise
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    return graph
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+
+# 2-bit packed genome cache.
+# A genome is stored as two files next to its FASTA:
+#   <fasta>.pack      bases of every contig, concatenated, four bases per byte
+#                     (A=0, C=1, G=2, T=3, first base in the high bits)
+#   <fasta>.pack.idx  tab-separated sidecar with the contig offsets and the
+#                     runs of non-ACGT bases, which are read back as 'N'
+
+import bisect
+import itertools
+import mmap
+import os
+import re
+
+PACK_SUFFIX = '.pack'
+INDEX_SUFFIX = '.pack.idx'
+PACK_VERSION = 1
+
+BASES = 'ACGT'
+_QUAD_TO_BYTE = {}
+for _i, _quad in enumerate(itertools.product(BASES, repeat=4)):
+    _QUAD_TO_BYTE[''.join(_quad)] = _i
+_BYTE_TO_QUAD = [None] * 256
+for _quad, _i in _QUAD_TO_BYTE.items():
+    _BYTE_TO_QUAD[_i] = _quad
+_NON_ACGT = re.compile('[^ACGT]+')
+
+
+def pack_bases(seq):
+    """
+    Pack a DNA string into bytes holding four bases each.
+
+    Parameters:
+    - seq (str): An upper-case DNA string. Characters other than A, C, G and T are stored as 'A'.
+
+    Returns:
+    - bytes: The packed bases; the last byte is padded with 'A'.
+    """
+
+    seq = _NON_ACGT.sub(lambda m: 'A' * len(m.group()), seq)
+    seq += 'A' * (-len(seq) % 4)
+    return bytes(_QUAD_TO_BYTE[seq[i:i+4]] for i in range(0, len(seq), 4))
+
+
+def unpack_bases(buf, start, stop):
+    """
+    Decode bases start..stop-1 from a packed buffer.
+
+    Parameters:
+    - buf (bytes-like): The packed bases.
+    - start (int): Offset of the first base to decode.
+    - stop (int): Offset just past the last base to decode.
+
+    Returns:
+    - str: The decoded bases.
+    """
+
+    if stop <= start:
+        return ''
+    first, last = start >> 2, (stop + 3) >> 2
+    quads = ''.join([_BYTE_TO_QUAD[b] for b in buf[first:last]])
+    return quads[start - 4*first:stop - 4*first]
+
+
+class PackedSequence(object):
+    """ Read-only, str-like view of one contig inside a packed genome buffer """
+
+    def __init__(self, buf, offset, length, n_blocks=()):
+        self.buf = buf  # packed bases (usually an mmap shared by every contig)
+        self.offset = offset  # offset of the contig's first base in buf
+        self.length = length
+        self.n_starts = [s for s, _ in n_blocks]  # sorted starts of the N runs
+        self.n_ends = [s + l for s, l in n_blocks]
+        self.source = None  # (callable, args) that reopens this view; set by mappedReference
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step != 1:
+                if step > 0 and start < stop:
+                    return self[start:stop][::step]
+                return ''.join([self[i] for i in range(start, stop, step)])
+            return self._decode(start, stop)
+        if key < 0:
+            key += self.length
+        if not 0 <= key < self.length:
+            raise IndexError('packed sequence index out of range')
+        return self._decode(key, key + 1)
+
+    def _decode(self, start, stop):
+        """ Decode bases start..stop-1 of the contig, restoring N runs """
+        seq = unpack_bases(self.buf, self.offset + start, self.offset + stop)
+        # N runs are sorted and disjoint, so only those ending after start can overlap
+        i = bisect.bisect_right(self.n_ends, start)
+        if i == len(self.n_starts) or self.n_starts[i] >= stop:
+            return seq
+        seq = list(seq)
+        while i < len(self.n_starts) and self.n_starts[i] < stop:
+            lo = max(self.n_starts[i], start) - start
+            hi = min(self.n_ends[i], stop) - start
+            seq[lo:hi] = 'N' * (hi - lo)
+            i += 1
+        return ''.join(seq)
+
+    def __str__(self):
+        return self._decode(0, self.length)
+
+    def __reduce__(self):
+        # Pickle by reference to the file so worker processes map the same pages
+        if self.source is None:
+            raise TypeError('cannot pickle a PackedSequence that was not opened by mappedReference')
+        return self.source
+
+    def __repr__(self):
+        return 'PackedSequence(offset=%d, length=%d)' % (self.offset, self.length)
+
+
+def cache_paths(fasta_filename):
+    """ Return the (packed bases, sidecar) paths used to cache a FASTA file """
+    return fasta_filename + PACK_SUFFIX, fasta_filename + INDEX_SUFFIX
+
+
+def write_packed_genome(contigs, pack_path, index_path):
+    """
+    Write contigs to a 2-bit packed file plus an offsets sidecar.
+
+    Soft-masked (lower-case) bases are upper-cased, and every base other
+    than A, C, G and T is recorded as part of an N run.
+
+    Parameters:
+    - contigs (dict): A mapping of contig name to DNA string.
+    - pack_path (str): Path of the packed bases file to write.
+    - index_path (str): Path of the sidecar file to write.
+    """
+
+    contigs = {name: seq.upper() for name, seq in contigs.items()}
+    write_genome_index(contigs, index_path, 'packedGenome')
+    with open(pack_path, 'wb') as fh:
+        fh.write(pack_bases(''.join(contigs.values())))
+
+
+def write_genome_index(contigs, index_path, tag, n_blocks=True):
+    """ Write the tab-separated sidecar describing the layout of concatenated contigs """
+    with open(index_path, 'w') as fh:
+        fh.write('#%s\t%d\n' % (tag, PACK_VERSION))
+        offset = 0
+        for name, seq in contigs.items():
+            fh.write('contig\t%s\t%d\t%d\n' % (name, offset, len(seq)))
+            if n_blocks:
+                for m in _NON_ACGT.finditer(seq):
+                    fh.write('nblock\t%s\t%d\t%d\n' % (name, m.start(), m.end() - m.start()))
+            offset += len(seq)
+
+
+def read_genome_index(index_path, tag):
+    """
+    Read a sidecar written by write_genome_index.
+
+    Parameters:
+    - index_path (str): Path of the sidecar file.
+    - tag (str): The expected file type tag, e.g. 'packedGenome'.
+
+    Returns:
+    - tuple: A tuple containing two dicts, in file order:
+        - contig name -> (offset, length) in the concatenated genome.
+        - contig name -> list of (start, length) N runs relative to the contig.
+
+    Raises:
+    - ValueError: If the sidecar is not a supported version of the expected type.
+    """
+
+    layout = {}
+    n_blocks = {}
+    with open(index_path) as fh:
+        header = fh.readline().rstrip('\n').split('\t')
+        if header[0] != '#' + tag or int(header[1]) != PACK_VERSION:
+            raise ValueError('%s: not a version %d %s index' % (index_path, PACK_VERSION, tag))
+        for line in fh:
+            kind, name, first, second = line.rstrip('\n').split('\t')
+            if kind == 'contig':
+                layout[name] = (int(first), int(second))
+                n_blocks[name] = []
+            else:
+                n_blocks[name].append((int(first), int(second)))
+    return layout, n_blocks
+
+
+def map_file(path):
+    """ Memory-map a file read-only so that every process shares the same physical pages """
+    if os.path.getsize(path) == 0:
+        return b''  # mmap cannot map an empty file
+    with open(path, 'rb') as fh:
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_packed_genome(pack_path, index_path):
+    """
+    Memory-map a packed genome written by write_packed_genome.
+
+    Parameters:
+    - pack_path (str): Path of the packed bases file.
+    - index_path (str): Path of the sidecar file.
+
+    Returns:
+    - dict: A mapping of contig name to PackedSequence, in file order.
+
+    Raises:
+    - ValueError: If the sidecar is not a supported packed genome index.
+    """
+
+    layout, n_blocks = read_genome_index(index_path, 'packedGenome')
+    buf = map_file(pack_path)
+    contigs = {}
+    for name, (offset, length) in layout.items():
+        contigs[name] = PackedSequence(buf, offset, length, n_blocks[name])
+    return contigs
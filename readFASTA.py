@@ -1,5 +1,11 @@
 #!/usr/bin/env python
 
+import os
+
+from packedGenome import cache_paths, load_packed_genome, write_packed_genome
+from readFASTQ import iter_lines, open_sequence_file
+
+
 def readFASTA(filename):
     """
     Reads DNA sequences from a FASTA file and concatenates them into a single string.
@@ -11,9 +17,84 @@ def readFASTA(filename):
     - str: A string representing the concatenated DNA sequences.
     """
 
-    genome = ''
-    with open(filename) as f:
-        for line in f:
-            if not line[0] == '>':
-                genome += line.rstrip()
-    return genome
+    return ''.join(seq for _, seq in iter_fasta_records(filename))
+
+
+def iter_fasta_records(filename):
+    """
+    Reads every record of a (optionally gzip-compressed) FASTA file.
+
+    Parameters:
+    - filename (str): The path to the FASTA file to be read.
+
+    Returns:
+    - generator: Yields a (name, sequence) tuple per record, in file order. The name is the header
+                 up to the first whitespace ('' for an empty header, or for sequence lines before any header).
+    """
+
+    name, chunks = None, []
+    with open_sequence_file(filename) as fh:
+        for line in iter_lines(fh):
+            if line.startswith('>'):
+                if name is not None or chunks:
+                    yield name or '', ''.join(chunks)  # join once per record: linear time
+                name, chunks = (line[1:].split() or [''])[0], []
+            else:
+                chunks.append(line.strip())
+    if name is not None or chunks:
+        yield name or '', ''.join(chunks)
+
+
+def readFASTA_contigs(filename):
+    """
+    Reads every record of a (optionally gzip-compressed) FASTA file, keeping contig boundaries.
+
+    Parameters:
+    - filename (str): The path to the FASTA file to be read.
+
+    Returns:
+    - dict: A mapping of contig name (the header up to the first whitespace) to its DNA sequence, in file order.
+
+    Raises:
+    - ValueError: If two records have the same name (including two records with an empty header).
+    """
+
+    contigs = {}
+    for name, seq in iter_fasta_records(filename):
+        if name in contigs:
+            raise ValueError('%s: duplicate contig name %r' % (filename, name))
+        contigs[name] = seq
+    return contigs
+
+
+def loadFASTA(filename, cache=False):
+    """
+    Load the contigs of a FASTA file, using the 2-bit packed cache next to it when it is up to date.
+
+    Parameters:
+    - filename (str): The path to the FASTA file to be read.
+    - cache (bool): If True, write the packed cache (see packedGenome) when it is missing or stale.
+
+    Returns:
+    - dict: A mapping of contig name to sequence. Contigs come back as memory-mapped
+            PackedSequence objects (upper-cased, other bases read as 'N') whenever the cache
+            is used or written, and as the raw strings otherwise.
+    """
+
+    pack_path, index_path = cache_paths(filename)
+    if _cache_is_fresh(filename, pack_path, index_path):
+        return load_packed_genome(pack_path, index_path)
+
+    contigs = readFASTA_contigs(filename)
+    if cache:
+        write_packed_genome(contigs, pack_path, index_path)
+        return load_packed_genome(pack_path, index_path)  # same normalized contigs as later cached calls
+    return contigs
+
+
+def _cache_is_fresh(filename, pack_path, index_path):
+    """ True if both cache files exist and are not older than the FASTA file """
+    if not (os.path.exists(pack_path) and os.path.exists(index_path)):
+        return False
+    source_mtime = os.path.getmtime(filename)
+    return os.path.getmtime(pack_path) >= source_mtime and os.path.getmtime(index_path) >= source_mtime
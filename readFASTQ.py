@@ -1,5 +1,119 @@
 #!/usr/bin/env python
 
+import gzip
+from collections import namedtuple
+
+FASTQRecord = namedtuple('FASTQRecord', ['name', 'seq', 'qual'])
+
+GZIP_MAGIC = b'\x1f\x8b'
+BLOCK_SIZE = 1 << 20  # bytes read from the file at a time
+
+
+def open_sequence_file(filename):
+    """
+    Open a sequence file for binary reading, transparently decompressing gzip input.
+
+    Parameters:
+    - filename (str): The path to a plain or gzip-compressed file.
+
+    Returns:
+    - file object: A binary file object positioned at the start of the data.
+    """
+
+    with open(filename, 'rb') as fh:
+        magic = fh.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(filename, 'rb')
+    return open(filename, 'rb')
+
+
+def iter_lines(fh, block_size=BLOCK_SIZE):
+    """
+    Yield the lines of a binary file object using fixed-size block reads.
+
+    Parameters:
+    - fh (file object): A binary file object.
+    - block_size (int): The number of bytes to read per block.
+
+    Returns:
+    - generator: Yields each line as a str without its line terminator.
+    """
+
+    leftover = b''
+    while True:
+        block = fh.read(block_size)
+        if not block:
+            break
+        lines = (leftover + block).split(b'\n')
+        leftover = lines.pop()  # last piece may be an incomplete line
+        for line in lines:
+            yield line.rstrip(b'\r').decode('ascii')
+    if leftover:
+        yield leftover.rstrip(b'\r').decode('ascii')
+
+
+def parseFASTQ(filename, batch_size=None, block_size=BLOCK_SIZE):
+    """
+    Stream records from a (optionally gzip-compressed) FASTQ file.
+
+    Parameters:
+    - filename (str): The path to the FASTQ file to be read.
+    - batch_size (int): If given, yield lists of up to 'batch_size' records instead of single records.
+    - block_size (int): The number of bytes to read from the file at a time.
+
+    Returns:
+    - generator: Yields FASTQRecord(name, seq, qual) tuples, or lists of them when 'batch_size' is set.
+
+    Raises:
+    - ValueError: If a record is truncated or does not follow the 4-line FASTQ layout.
+    """
+
+    if batch_size is not None and batch_size < 1:
+        raise ValueError('batch_size must be a positive integer')
+
+    with open_sequence_file(filename) as fh:
+        records = _parse_records(iter_lines(fh, block_size), filename)
+        if batch_size is None:
+            for record in records:
+                yield record
+            return
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _parse_records(lines, filename):
+    """ Group lines into FASTQ records, validating each 4-line record """
+    lineno = 0
+    for header in lines:
+        lineno += 1
+        if len(header) == 0:
+            continue  # tolerate blank lines between records
+        record = [header]
+        for line in lines:
+            record.append(line)
+            if len(record) == 4:
+                break
+        if len(record) < 4:
+            raise ValueError('%s: truncated FASTQ record starting at line %d' % (filename, lineno))
+
+        header, seq, plus, qual = record
+        if not header.startswith('@'):
+            raise ValueError('%s: expected "@" at line %d' % (filename, lineno))
+        if not plus.startswith('+'):
+            raise ValueError('%s: expected "+" at line %d' % (filename, lineno + 2))
+        if len(seq) != len(qual):
+            raise ValueError('%s: sequence and quality lengths differ in record at line %d' % (filename, lineno))
+        lineno += 3
+        yield FASTQRecord(header[1:], seq, qual)
+
+
 def readFASTQ(filename):
     """
     Reads data from a FASTQ file and extracts sequence information.
@@ -15,15 +129,8 @@ def readFASTQ(filename):
 
     sequences = []
     qualities = []
-    with open(filename) as fh:
-        while True:
-            fh.readline() # skip name line
-            seq = fh.readline().rstrip() # read base sequence
-            fh.readline() # skip placeholder line
-            qual = fh.readline().rstrip() #base quality line
-            if len(seq) == 0:
-                break
-            sequences.append(seq)
-            qualities.append(qual)
-            
+    for record in parseFASTQ(filename):
+        sequences.append(record.seq)
+        qualities.append(record.qual)
+
     return sequences, qualities
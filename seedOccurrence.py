@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+# Seed occurrence statistics and max-hits cutoffs.
+# Low-complexity seeds (poly-A, short tandem repeats) occur thousands of times
+# in a genome, and every occurrence becomes a candidate to verify. An index
+# summarizes how often its seeds occur when it is built, and queries can skip
+# any seed with more than 'max_hits' occurrences: the read is then aligned
+# with its other, more specific seeds, and the skipped seeds are reported.
+
+import heapq
+import itertools
+
+
+def occurrence_stats(keys, top=10):
+    """
+    Summarize how often the seeds of an index occur.
+
+    Parameters:
+    - keys (iterable): The seed of every indexed position, in sorted order (equal seeds adjacent).
+    - top (int): The number of most frequent seeds to report.
+
+    Returns:
+    - dict: 'positions' (number of indexed positions), 'distinct' (number of distinct seeds),
+            'max' (occurrences of the most frequent seed), 'mean' (average occurrences per
+            distinct seed) and 'top' (the 'top' most frequent seeds as (seed, count) tuples).
+    """
+
+    runs = ((key, sum(1 for _ in group)) for key, group in itertools.groupby(keys))
+    positions = 0
+    distinct = 0
+    largest = []  # min-heap of (count, seed) holding the 'top' most frequent seeds
+    for key, count in runs:
+        positions += count
+        distinct += 1
+        if len(largest) < top:
+            heapq.heappush(largest, (count, key))
+        elif count > largest[0][0]:
+            heapq.heapreplace(largest, (count, key))
+    return {'positions': positions,
+            'distinct': distinct,
+            'max': max([count for count, _ in largest] or [0]),
+            'mean': float(positions) / distinct if distinct else 0.0,
+            'top': [(key, count) for count, key in sorted(largest, reverse=True)]}
+
+
+def over_max_hits(index, seed, max_hits, masked=None):
+    """
+    Check a seed against a max-hits cutoff before querying it.
+
+    Parameters:
+    - index (object): An index with a count(seed) method.
+    - seed (str): The seed (as passed to index.query).
+    - max_hits (int): The cutoff; None disables it.
+    - masked (list): If given, a seed over the cutoff is appended to it.
+
+    Returns:
+    - bool: True if the seed occurs more than 'max_hits' times and should be skipped.
+    """
+
+    if max_hits is None or index.count(seed) <= max_hits:
+        return False
+    if masked is not None:
+        masked.append(seed)
+    return True
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+"""spacedSeedIndex.py: An array-backed index of spaced seeds, for one or several seed masks."""
+
+import bisect
+from array import array
+
+from kmerEncoding import OFFSET_TYPECODE, encode_kmer, iter_kmer_codes
+from seedOccurrence import occurrence_stats
+
+
+def _key_typecode(weight):
+    """ Smallest unsigned array typecode holding a 2-bit key of 'weight' bases """
+    for typecode in ('I', 'L', 'Q'):
+        if array(typecode).itemsize * 8 >= 2 * weight:
+            return typecode
+    raise ValueError('seed weight %d is too large' % weight)
+
+
+class SpacedSeed(object):
+    """ One seed mask, e.g. '1101011': the bases under the 1s form the key, the 0s are ignored """
+
+    def __init__(self, mask):
+        if not mask or set(mask) - set('01') or '1' not in mask:
+            raise ValueError('seed mask must be a string of 0s and 1s with at least one 1: %r' % (mask,))
+        self.mask = mask
+        self.span = len(mask)  # window length covered by the seed
+        self.positions = [i for i, c in enumerate(mask) if c == '1']
+        self.weight = len(self.positions)  # number of bases in the key
+        # runs of 1s as (shift, bit mask, width) over the 2-bit code of the whole window,
+        # so a key is pulled out of a window code with one shift-and-mask per run
+        self.runs = []
+        i = 0
+        while i < self.span:
+            if mask[i] == '1':
+                j = i
+                while j + 1 < self.span and mask[j+1] == '1':
+                    j += 1
+                width = 2 * (j - i + 1)
+                self.runs.append((2 * (self.span - 1 - j), (1 << width) - 1, width))
+                i = j + 1
+            else:
+                i += 1
+
+    def key_from_code(self, code):
+        """ The key of a window, given the 2-bit code of the whole window """
+        key = 0
+        for shift, bits, width in self.runs:
+            key = (key << width) | ((code >> shift) & bits)
+        return key
+
+    def key(self, s):
+        """ The key of the window at the start of s, or None if it is too short or not ACGT """
+        if len(s) < self.span:
+            return None
+        return encode_kmer(''.join([s[i] for i in self.positions]))
+
+
+class SpacedSeedIndex(object):
+    """ Holds a spaced-seed index for a text T, one sorted key array per seed mask.
+
+        For each mask, the 2-bit keys of all windows of T are stored sorted
+        in an array, with the window offsets in a parallel array, so a
+        lookup is a binary search over flat arrays.  Windows holding
+        characters other than A, C, G and T are not indexed. """
+
+    def __init__(self, t, masks):
+        """ Create index from all windows of t, for one mask ('1101011') or a list of masks """
+        if isinstance(masks, str):
+            masks = [masks]
+        self.seeds = [SpacedSeed(mask) for mask in masks]
+        self.masks = [seed.mask for seed in self.seeds]
+        self.keys = []
+        self.offsets = []
+        for seed in self.seeds:
+            keys = array(_key_typecode(seed.weight))
+            offsets = array(OFFSET_TYPECODE)
+            for i, code in iter_kmer_codes(t, seed.span):
+                keys.append(seed.key_from_code(code))
+                offsets.append(i)
+            order = sorted(range(len(keys)), key=keys.__getitem__)  # stable: offsets stay ascending per key
+            self.keys.append(array(keys.typecode, [keys[i] for i in order]))
+            self.offsets.append(array(OFFSET_TYPECODE, [offsets[i] for i in order]))
+
+    def _range(self, p, mask_id):
+        """ The slice of keys and offsets holding the first seed of p under mask number 'mask_id' """
+        key = self.seeds[mask_id].key(p)
+        if key is None:
+            return 0, 0
+        keys = self.keys[mask_id]
+        lo = bisect.bisect_left(keys, key)
+        return lo, bisect.bisect_right(keys, key, lo)
+
+    def count(self, p, mask_id=0):
+        """ Return the number of index hits for the first seed of p, without collecting them """
+        lo, hi = self._range(p, mask_id)
+        return hi - lo
+
+    def query(self, p, mask_id=0, max_hits=None):
+        """ Return index hits for the first seed of p under mask number 'mask_id';
+            none if there are more than max_hits """
+        lo, hi = self._range(p, mask_id)
+        if max_hits is not None and hi - lo > max_hits:
+            return self.offsets[mask_id][0:0]  # over-represented seed (e.g. a repeat): skip it
+        return self.offsets[mask_id][lo:hi]  # array slice: no per-hit objects
+
+    def seed_hits(self, p, max_hits=None, masked=None):
+        """ Return (text offset, mask id, pattern offset) for every seed of every mask placed along p.
+            Seeds with more than max_hits hits are skipped and, if 'masked' is a list,
+            recorded in it as (mask id, pattern offset). """
+        hits = []
+        for mask_id, seed in enumerate(self.seeds):
+            for j in range(len(p) - seed.span + 1):
+                lo, hi = self._range(p[j:j+seed.span], mask_id)
+                if max_hits is not None and hi - lo > max_hits:
+                    if masked is not None:
+                        masked.append((mask_id, j))
+                    continue
+                hits.extend((offset, mask_id, j) for offset in self.offsets[mask_id][lo:hi])
+        return hits
+
+    def occurrence_stats(self, mask_id=0):
+        """ Return how often the keys of mask number 'mask_id' occur (see seedOccurrence);
+            seeds are reported as 2-bit keys """
+        return occurrence_stats(self.keys[mask_id])
+
+    def nbytes(self):
+        """ Return the number of bytes held by the key and offset arrays """
+        return sum(len(a) * a.itemsize for a in self.keys + self.offsets)
@@ -1,6 +1,10 @@
 #!usr/bin/env python
 
 import bisect
+import sys
+
+from indexIO import SortedKeyView, read_index, write_index
+from seedOccurrence import occurrence_stats
    
 class SubseqIndex(object):
     """ Holds a subsequence index for a text T """
@@ -16,10 +20,26 @@ class SubseqIndex(object):
         for i in range(len(t) - self.span + 1):  # for each subseq
             self.index.append((t[i:i+self.span:ival], i))  # add (subseq, offset) #i(start), self.span(stop),ival(step)
         self.index.sort()  # alphabetize by subseq
+        self._occ_stats = None
+        self.occurrence_stats()  # summarized at build time; a loaded index computes it on first use
+
+    def occurrence_stats(self):
+        """ Return how often the subsequences of the index occur (see seedOccurrence) """
+        if self._occ_stats is None:
+            self._occ_stats = occurrence_stats(self.index[i][0] for i in range(len(self.index)))
+        return self._occ_stats
+
+    def count(self, p):
+        """ Return the number of index hits for first subseq of p, without collecting them """
+        subseq = p[:self.span:self.ival]
+        return (bisect.bisect_left(self.index, (subseq, sys.maxsize))
+                - bisect.bisect_left(self.index, (subseq, -1)))
     
-    def query(self, p):
-        """ Return index hits for first subseq of p """
+    def query(self, p, max_hits=None):
+        """ Return index hits for first subseq of p; none if there are more than max_hits """
         subseq = p[:self.span:self.ival]  # query with first subseq
+        if max_hits is not None and self.count(p) > max_hits:
+            return []  # over-represented subsequence (e.g. a repeat): skip it
         i = bisect.bisect_left(self.index, (subseq, -1))  # binary search
         hits = []
         while i < len(self.index):  # collect matching index entries
@@ -29,3 +49,19 @@ class SubseqIndex(object):
             i += 1
             
         return hits
+
+    def save(self, path, t):
+        """ Write the index for text t to path (see indexIO) """
+        write_index(path, 'subseq', t, self.k, self.ival, [[offset for _, offset in self.index]])
+
+    @classmethod
+    def load(cls, path, t, verify=True):
+        """ Memory-map an index saved for text t instead of rebuilding it """
+        header, (offsets, _) = read_index(path, 'subseq', t, verify)
+        index = cls.__new__(cls)
+        index.k = header['k']
+        index.ival = header['ival']
+        index.span = 1 + index.ival * (index.k - 1)
+        index.index = SortedKeyView(t, offsets, index.span, index.ival)
+        index._occ_stats = None
+        return index